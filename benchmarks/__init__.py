@@ -0,0 +1,5 @@
+# Offline benchmarks for cogwatch. They drive a `Watcher` against an in-memory
+# stand-in for `commands.Bot`, so no Discord token or network access is needed.
+#
+# Run them with `poetry run benchmark`, or `python -m benchmarks --help` for
+# the available options.
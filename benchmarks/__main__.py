@@ -0,0 +1,70 @@
+import argparse
+import asyncio
+import json
+
+from benchmarks.fake_bot import CLIENTS
+from benchmarks.runner import run
+from benchmarks.storms import SCENARIOS
+
+COLUMNS = (
+    ('client', 'client', '{}'),
+    ('scenario', 'scenario', '{}'),
+    ('events', 'events', '{}'),
+    ('actions', 'actions', '{}'),
+    ('events/s', 'events_per_second', '{:.0f}'),
+    ('p50 ms', 'latency_p50_ms', '{:.2f}'),
+    ('p95 ms', 'latency_p95_ms', '{:.2f}'),
+    ('p99 ms', 'latency_p99_ms', '{:.2f}'),
+    ('batch ms', 'batch_mean_ms', '{:.2f}'),
+    ('blocked max ms', 'blocked_max_ms', '{:.2f}'),
+    ('blocked total ms', 'blocked_total_ms', '{:.2f}'),
+)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks', description='Replays change storms against a Watcher and a fake bot.'
+    )
+    parser.add_argument('--cogs', type=int, default=100, help='number of generated cogs (default: 100)')
+    parser.add_argument('--groups', type=int, default=10, help='number of sub-packages to spread them over')
+    parser.add_argument('--runs', type=int, default=5, help='runs per scenario, each on a fresh tree (default: 5)')
+    parser.add_argument('--setup-cost', type=float, default=0.0, help='CPU time spent in each setup, in ms')
+    parser.add_argument('--clients', nargs='+', choices=sorted(CLIENTS), default=sorted(CLIENTS))
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--replay', metavar='FILE', help='replay a recorded burst instead of the scenarios')
+    parser.add_argument('--no-precompile', action='store_true', help='disable the `precompile` option')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    return parser.parse_args(argv)
+
+
+def format_table(summaries: list) -> str:
+    rows = [[header for header, _, _ in COLUMNS]]
+    rows.extend([fmt.format(summary[key]) for _, key, fmt in COLUMNS] for summary in summaries)
+    widths = [max(len(row[i]) for row in rows) for i in range(len(COLUMNS))]
+    return '\n'.join('  '.join(cell.rjust(width) for cell, width in zip(row, widths)) for row in rows)
+
+
+async def main(argv=None):
+    args = parse_args(argv)
+    scenarios = ['replay'] if args.replay else args.scenarios
+
+    summaries = []
+    for client in args.clients:
+        for scenario in scenarios:
+            result = await run(
+                client,
+                scenario,
+                cogs=args.cogs,
+                groups=args.groups,
+                runs=args.runs,
+                cost=args.setup_cost / 1000,
+                precompile=not args.no_precompile,
+                replay=args.replay,
+            )
+            summaries.append(result.summary())
+
+    print(json.dumps(summaries, indent=2) if args.json else format_table(summaries))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,77 @@
+import importlib
+import inspect
+import sys
+
+
+class ExtensionError(Exception):
+    pass
+
+
+class FakeBot:
+    """In-memory stand-in for `commands.Bot` with discord.py's async extension methods.
+
+    Extensions are imported and set up for real, so the cost of importing the
+    generated cogs is part of every measurement; nothing talks to Discord.
+    """
+
+    def __init__(self):
+        self.extensions = {}
+        self.cogs = {}
+
+    def add_cog(self, cog):
+        self.cogs[type(cog).__name__] = cog
+
+    def remove_cog(self, name):
+        self.cogs.pop(name, None)
+
+    def _load(self, name):
+        if name in self.extensions:
+            raise ExtensionError(f'{name} is already loaded')
+
+        module = importlib.import_module(name)
+        setup = getattr(module, 'setup', None)
+        if setup is None:
+            del sys.modules[name]
+            raise ExtensionError(f'{name} has no setup function')
+
+        self.extensions[name] = module
+        return setup(self)
+
+    def _unload(self, name):
+        module = self.extensions.pop(name, None)
+        if module is None:
+            raise ExtensionError(f'{name} is not loaded')
+
+        teardown = getattr(module, 'teardown', None)
+        if teardown is not None:
+            teardown(self)
+        sys.modules.pop(name, None)
+
+    async def load_extension(self, name):
+        result = self._load(name)
+        if inspect.isawaitable(result):
+            await result
+
+    async def unload_extension(self, name):
+        self._unload(name)
+
+    async def reload_extension(self, name):
+        self._unload(name)
+        await self.load_extension(name)
+
+
+class SyncFakeBot(FakeBot):
+    """Variant of `FakeBot` with the blocking extension methods of nextcord and disnake."""
+
+    def load_extension(self, name):
+        self._load(name)
+
+    def unload_extension(self, name):
+        self._unload(name)
+
+    def reload_extension(self, name):
+        self._unload(name)
+        self._load(name)
+
+
+CLIENTS = {'async': FakeBot, 'sync': SyncFakeBot}
@@ -0,0 +1,157 @@
+import asyncio
+import importlib
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from cogwatch import Watcher
+from cogwatch.metrics import Histogram
+
+from benchmarks.fake_bot import CLIENTS
+from benchmarks.storms import CogTree
+
+
+class LoopMonitor:
+    """Measures how long the event loop is blocked, from how late a periodic wake-up fires."""
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.lag = Histogram()
+        self.blocked = 0.0
+        self._running = False
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self._running:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self.lag.observe(lag)
+            self.blocked += lag
+
+    async def start(self):
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+        # let the first wake-up be scheduled before the measured code runs
+        await asyncio.sleep(0)
+
+    async def stop(self):
+        # the last wake-up is still awaited, so a block right at the end is counted
+        self._running = False
+        await self._task
+
+
+class Result:
+    """Measurements of one scenario against one client, accumulated over every run."""
+
+    def __init__(self, client: str, scenario: str):
+        self.client = client
+        self.scenario = scenario
+        self.events = 0
+        self.actions = 0
+        self.failed = 0
+        self.seconds = 0.0
+        self.latency = Histogram()
+        self.batches = Histogram()
+        self.blocked = 0.0
+        self.blocked_max = 0.0
+
+    def summary(self) -> dict:
+        return {
+            'client': self.client,
+            'scenario': self.scenario,
+            'events': self.events,
+            'actions': self.actions,
+            'failed': self.failed,
+            'events_per_second': self.events / self.seconds if self.seconds else 0.0,
+            'latency_p50_ms': self.latency.percentile(50) * 1000,
+            'latency_p95_ms': self.latency.percentile(95) * 1000,
+            'latency_p99_ms': self.latency.percentile(99) * 1000,
+            'batch_mean_ms': self.batches.mean * 1000,
+            'blocked_max_ms': self.blocked_max * 1000,
+            'blocked_total_ms': self.blocked * 1000,
+        }
+
+
+async def run_once(
+    result: Result,
+    directory: Path,
+    package: str,
+    cogs: int,
+    groups: int,
+    cost: float,
+    seed: int,
+    precompile: bool,
+    replay: Optional[str],
+):
+    tree = CogTree(directory, package, cogs=cogs, groups=groups, cost=cost, seed=seed)
+    tree.generate()
+    importlib.invalidate_caches()
+
+    client = CLIENTS[result.client]()
+    watcher = Watcher(client, path=package, default_logger=False, precompile=precompile)
+    watcher.scan_dependencies()
+    await watcher._preload()
+
+    bursts = tree.replay(replay) if replay is not None else iter([None])
+    for burst in bursts:
+        raw = burst if burst is not None else getattr(tree, result.scenario)()
+        importlib.invalidate_caches()
+        # watchfiles drops filtered files before cogwatch sees them
+        changes = {change for change in raw if watcher.watch_filter(*change)}
+
+        monitor = LoopMonitor()
+        await monitor.start()
+        started = time.perf_counter()
+        results = await watcher.handle_changes(changes)
+        elapsed = time.perf_counter() - started
+        await monitor.stop()
+
+        result.events += len(raw)
+        result.seconds += elapsed
+        result.batches.observe(elapsed)
+        result.blocked += monitor.blocked
+        result.blocked_max = max(result.blocked_max, monitor.lag.max)
+        for action in results:
+            result.actions += 1
+            result.failed += not action['ok']
+            result.latency.observe(action['seconds'])
+
+
+async def run(
+    client: str,
+    scenario: str,
+    cogs: int = 100,
+    groups: int = 10,
+    runs: int = 5,
+    cost: float = 0.0,
+    precompile: bool = True,
+    replay: Optional[str] = None,
+) -> Result:
+    """Runs a scenario `runs` times against a fresh tree of generated cogs.
+
+    The trees are generated in a temporary directory, which is made the working
+    directory and put on `sys.path` for the duration of the run, like a bot's
+    project directory.
+    """
+    result = Result(client, 'replay' if replay is not None else scenario)
+    cwd = os.getcwd()
+
+    for i in range(runs):
+        package = f'cogwatch_benchmark_{os.getpid()}_{i}'
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            sys.path.insert(0, directory)
+            try:
+                await run_once(result, Path(directory), package, cogs, groups, cost, i, precompile, replay)
+            finally:
+                os.chdir(cwd)
+                sys.path.remove(directory)
+                for name in [name for name in sys.modules if name.split('.')[0] == package]:
+                    del sys.modules[name]
+
+    return result
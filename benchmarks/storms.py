@@ -0,0 +1,164 @@
+import json
+import os
+import random
+import shutil
+from pathlib import Path
+from typing import Iterator
+
+from watchfiles import Change
+
+COG_TEMPLATE = '''import time
+
+from {package}.{group} import helpers
+
+REVISION = {revision}
+
+
+class {name}:
+    def __init__(self, bot):
+        self.bot = bot
+
+
+def setup(bot):
+    # stands in for the work a real cog does on setup
+    deadline = time.perf_counter() + {cost}
+    while time.perf_counter() < deadline:
+        pass
+    bot.add_cog({name}(bot))
+
+
+def teardown(bot):
+    bot.remove_cog('{name}')
+'''
+
+HELPER_TEMPLATE = '''REVISION = {revision}
+
+
+def shared():
+    return REVISION
+'''
+
+
+class CogTree:
+    """A generated tree of cogs under `root / package`, split into `groups` sub-packages.
+
+    Every group holds a `helpers` module imported by each of its cogs, so that
+    changing a helper reloads its dependents like in a real bot. Each method
+    below changes the tree on disk the way an editor or VCS operation would,
+    and returns the `(Change, path)` set that watchfiles would report for it.
+    """
+
+    def __init__(self, root: Path, package: str, cogs: int = 100, groups: int = 10, cost: float = 0.0, seed: int = 0):
+        self.root = root
+        self.package = package
+        self.path = root / package
+        self.groups = max(1, groups)
+        self.cost = cost
+        self.random = random.Random(seed)
+        self.revision = 0
+        self.cogs = [self.path / f'group_{i % self.groups}' / f'cog_{i}.py' for i in range(cogs)]
+
+    def generate(self):
+        self.path.mkdir(parents=True)
+        (self.path / '__init__.py').write_text('')
+        for i in range(self.groups):
+            group = self.path / f'group_{i}'
+            group.mkdir()
+            (group / '__init__.py').write_text('')
+            self.write(group / 'helpers.py')
+
+        for cog in self.cogs:
+            self.write(cog)
+
+    def render(self, path: Path) -> str:
+        """Returns new contents for a file, with a higher revision than any before."""
+        self.revision += 1
+        if path.name == 'helpers.py':
+            return HELPER_TEMPLATE.format(revision=self.revision)
+
+        name = ''.join(part.title() for part in path.stem.split('_'))
+        return COG_TEMPLATE.format(
+            package=self.package, group=path.parent.name, revision=self.revision, name=name, cost=self.cost
+        )
+
+    def write(self, path: Path):
+        path.write_text(self.render(path))
+
+    def existing(self) -> list:
+        return [cog for cog in self.cogs if cog.exists()]
+
+    def single_save(self) -> set:
+        """One cog saved in place."""
+        cog = self.random.choice(self.existing())
+        self.write(cog)
+        return {(Change.modified, str(cog))}
+
+    def editor_save(self) -> set:
+        """One cog saved through a swap file, which is renamed over the original (vim, JetBrains)."""
+        cog = self.random.choice(self.existing())
+        swap = cog.with_name(f'.{cog.name}.swp')
+        swap.write_text(self.render(cog))
+        os.replace(swap, cog)
+        return {
+            (Change.added, str(swap)),
+            (Change.deleted, str(swap)),
+            (Change.deleted, str(cog)),
+            (Change.added, str(cog)),
+            (Change.modified, str(cog)),
+        }
+
+    def branch_switch(self, fraction: float = 0.3) -> set:
+        """A checkout that rewrites a fraction of the cogs, one helper, and adds and removes a few cogs."""
+        existing = self.existing()
+        changes = set()
+        for cog in self.random.sample(existing, max(1, int(len(existing) * fraction))):
+            self.write(cog)
+            changes.add((Change.modified, str(cog)))
+
+        helper = self.path / f'group_{self.random.randrange(self.groups)}' / 'helpers.py'
+        self.write(helper)
+        changes.add((Change.modified, str(helper)))
+
+        for cog in self.random.sample(existing, max(1, len(existing) // 20)):
+            cog.unlink()
+            changes.add((Change.deleted, str(cog)))
+
+        for i in range(max(1, len(existing) // 20)):
+            cog = self.path / f'group_{i % self.groups}' / f'branch_cog_{self.revision}_{i}.py'
+            self.cogs.append(cog)
+            self.write(cog)
+            changes.add((Change.added, str(cog)))
+
+        return changes
+
+    def mass_delete(self) -> set:
+        """Every cog in the tree removed at once, ie. `rm -r` or checking out an unrelated branch."""
+        changes = {(Change.deleted, str(file)) for file in self.path.rglob('*.py')}
+        shutil.rmtree(self.path)
+        return changes
+
+    def replay(self, path: str) -> Iterator[set]:
+        """Applies a recorded burst to the tree, one batch at a time.
+
+        The recording is a JSON list of batches, each a list of
+        `[change, path]` pairs, where `change` is `added`, `modified` or
+        `deleted` and `path` is relative to the cogs directory. Added and
+        modified files get generated cog contents. Yields the changes of each
+        batch once it has been applied.
+        """
+        for batch in json.loads(Path(path).read_text()):
+            changes = set()
+            for change, relative in batch:
+                file = self.path / relative
+                if change == 'deleted':
+                    if file.exists():
+                        file.unlink()
+                else:
+                    file.parent.mkdir(parents=True, exist_ok=True)
+                    self.write(file)
+                changes.add((Change[change], str(file)))
+
+            yield changes
+
+
+SCENARIOS = ('single_save', 'editor_save', 'branch_switch', 'mass_delete')
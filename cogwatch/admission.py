@@ -0,0 +1,163 @@
+import asyncio
+import collections
+import contextlib
+import logging
+import time
+
+logger = logging.getLogger('cogwatch')
+
+DECISIONS = ('admitted', 'paced', 'deferred', 'forced')
+
+
+class LagMonitor:
+    """Continuously measures event loop lag, from how late a periodic wake-up fires."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.lag = 0.0
+        self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if not self.running:
+            self.lag = 0.0
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lag = max(0.0, loop.time() - started - self.interval)
+
+
+class TokenBucket:
+    """Allows `rate` operations per second on average, in bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> float:
+        """Takes a token, waiting for one if needed. Returns the time waited in seconds."""
+        waited = 0.0
+        self.refill()
+        while self.tokens < 1:
+            delay = (1 - self.tokens) / self.rate
+            await asyncio.sleep(delay)
+            waited += delay
+            self.refill()
+
+        self.tokens -= 1
+        return waited
+
+
+class AdmissionController:
+    """Paces extension operations so that a burst of reloads cannot starve the event loop.
+
+    Before each operation, a token is taken from a bucket refilling at `rate`
+    operations per second, and the loop is yielded to at least once. If the
+    measured event loop lag is above `lag_threshold` seconds, the operation is
+    deferred until the lag recovers, for at most `max_defer` seconds; after
+    that it runs anyway, and so do the operations after it until the lag
+    recovers, so reloads cannot be held back forever by lag that has other
+    causes. Lag is only measured inside `batch()`.
+
+    Every decision is counted in `counts` and the most recent ones are kept
+    in `decisions`: 'admitted' (ran straight away), 'paced' (waited for a
+    token), 'deferred' (waited for the lag to recover) or 'forced' (ran
+    despite the lag after `max_defer`).
+    """
+
+    def __init__(
+        self,
+        rate: float = 20.0,
+        burst: int = 10,
+        lag_threshold: float = 0.1,
+        max_defer: float = 30.0,
+        history: int = 256,
+    ):
+        self.bucket = TokenBucket(rate, burst)
+        self.monitor = LagMonitor()
+        self.lag_threshold = lag_threshold
+        self.max_defer = max_defer
+        self.counts = collections.Counter()
+        self.decisions = collections.deque(maxlen=history)
+        self._batches = 0
+        # set once an operation waited out `max_defer`, until the lag recovers
+        self._forced = False
+
+    @contextlib.asynccontextmanager
+    async def batch(self):
+        """Measures event loop lag while a batch of operations runs. Batches may be nested."""
+        if self._batches == 0:
+            self._forced = False
+            self.monitor.start()
+        self._batches += 1
+        try:
+            yield self
+        finally:
+            self._batches -= 1
+            if self._batches == 0:
+                self.monitor.stop()
+
+    async def admit(self, operation: str, name: str) -> dict:
+        """Waits until an operation may run. Returns the decision that was made."""
+        started = time.perf_counter()
+
+        decision = 'paced' if await self.bucket.acquire() else 'admitted'
+        # give the heartbeat (and anything else waiting) a turn between operations
+        await asyncio.sleep(0)
+
+        lag = self.monitor.lag
+        if lag <= self.lag_threshold:
+            self._forced = False
+        elif self._forced:
+            # an earlier operation already waited out `max_defer`; the lag has other causes
+            decision = 'forced'
+        else:
+            logger.info(
+                f'Deferring {operation} of {name}; event loop lag is {lag * 1000:.0f}ms '
+                f'(threshold {self.lag_threshold * 1000:.0f}ms).'
+            )
+            decision = 'deferred'
+            deadline = time.perf_counter() + self.max_defer
+            while self.monitor.lag > self.lag_threshold:
+                if time.perf_counter() >= deadline:
+                    logger.warning(f'Event loop lag did not recover within {self.max_defer}s; running {name} anyway.')
+                    decision = 'forced'
+                    self._forced = True
+                    break
+                await asyncio.sleep(self.monitor.interval)
+
+        record = {
+            'operation': operation,
+            'name': name,
+            'decision': decision,
+            'waited': time.perf_counter() - started,
+            'lag': lag,
+        }
+        self.counts[decision] += 1
+        self.decisions.append(record)
+        return record
+
+    def summary(self) -> dict:
+        """Returns the number of operations per decision, and the current lag."""
+        summary = {decision: self.counts[decision] for decision in DECISIONS}
+        summary['lag'] = self.monitor.lag
+        return summary
@@ -0,0 +1,196 @@
+import asyncio
+import importlib
+import inspect
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger('cogwatch')
+
+
+class StubBot:
+    """A permissive stand-in for the bot passed to `setup` in a canary process.
+
+    Every attribute, call and await returns another stub, so typical setup
+    code such as `await bot.add_cog(MyCog(bot))` runs without a real client.
+    """
+
+    def __getattr__(self, name):
+        return StubBot()
+
+    def __call__(self, *args, **kwargs):
+        return StubBot()
+
+    def __await__(self):
+        return StubBot()
+        yield
+
+    def __iter__(self):
+        return iter(())
+
+    def __bool__(self):
+        return False
+
+
+def limit_memory(budget: int):
+    """Caps this process' address space at its current size plus `budget` bytes, where supported.
+
+    The current size is read from `/proc`, so the budget is only enforced on
+    Linux; on macOS and Windows canary checks run without a memory limit.
+    """
+    try:
+        import resource
+
+        with open('/proc/self/statm') as f:
+            current = int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+
+        resource.setrlimit(resource.RLIMIT_AS, (current + budget, current + budget))
+    except (ImportError, OSError, ValueError) as exc:
+        logger.debug(f'Not limiting the memory of canary checks: {exc!r}')
+
+
+def run_canary(name: str, budget: int) -> dict:
+    """Imports an extension and runs its setup against a `StubBot`."""
+    limit_memory(budget)
+
+    try:
+        module = importlib.import_module(name)
+        setup = getattr(module, 'setup', None)
+        if setup is None:
+            return {'ok': False, 'error': 'no entry point found'}
+
+        result = setup(StubBot())
+        if inspect.isawaitable(result):
+            asyncio.run(_await(result))
+    except MemoryError:
+        return {'ok': False, 'error': 'exceeded the memory budget'}
+    except BaseException as exc:
+        return {'ok': False, 'error': f'{type(exc).__name__}: {exc}'}
+
+    return {'ok': True, 'error': None}
+
+
+async def _await(awaitable):
+    return await awaitable
+
+
+class CanaryPool:
+    """A warm pool of subprocesses that try out cogs before they reach the live bot.
+
+    Each worker is started ahead of time, with cogwatch and the bot library
+    already imported, and checks a single cog before exiting; a replacement is
+    started straight away. A cog passes if it imports and its `setup` runs
+    within `timeout` seconds and `memory` bytes of additional address space.
+    """
+
+    def __init__(
+        self, size: int = 2, timeout: float = 10.0, memory: int = 512 * 1024 * 1024, backend: Optional[str] = None
+    ):
+        self.size = size
+        self.timeout = timeout
+        self.memory = memory
+        self.backend = backend
+        self.idle = asyncio.Queue()
+        self._started = False
+        self._spawning = set()
+
+    async def spawn(self):
+        # make sure the worker imports this copy of cogwatch
+        package_root = str(Path(__file__).resolve().parent.parent)
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [package_root, env.get('PYTHONPATH')]))
+
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            '-c',
+            'from cogwatch.canary import main; main()',
+            *filter(None, [self.backend]),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            env=env,
+        )
+
+        # the worker reports in once its imports are done, so that warm-up
+        # does not count against the time budget of a check
+        if await process.stdout.readline() == b'ready\n':
+            await self.idle.put(process)
+        else:
+            logger.error(f'A canary worker failed to start (exit code {await process.wait()}).')
+
+    def refill(self):
+        task = asyncio.create_task(self.spawn())
+        self._spawning.add(task)
+        task.add_done_callback(self._spawning.discard)
+
+    async def start(self):
+        """Starts the idle workers, if they are not running yet."""
+        if not self._started:
+            self._started = True
+            await asyncio.gather(*(self.spawn() for _ in range(self.size)))
+
+    async def check(self, name: str) -> Optional[str]:
+        """Tries out an extension in a worker. Returns the error, or None if it passed."""
+        await self.start()
+        try:
+            # leave room for a replacement worker to warm up
+            process = await asyncio.wait_for(self.idle.get(), self.timeout + 30)
+        except asyncio.TimeoutError:
+            return 'no canary worker available'
+
+        self.refill()
+
+        # cogs from roots outside the working directory are only importable through the parent's path
+        request = json.dumps({'name': name, 'memory': self.memory, 'path': sys.path}).encode() + b'\n'
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(request), self.timeout)
+        except asyncio.TimeoutError:
+            return f'timed out after {self.timeout}s'
+        finally:
+            # also reached when the check is cancelled, which would otherwise leave the worker running
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+
+        try:
+            result = json.loads(stdout.decode().strip().splitlines()[-1])
+        except (ValueError, IndexError):
+            return f'worker exited with code {process.returncode}'
+
+        return None if result['ok'] else result['error']
+
+    async def close(self):
+        """Stops every idle worker."""
+        for task in list(self._spawning):
+            await task
+
+        while not self.idle.empty():
+            process = self.idle.get_nowait()
+            process.kill()
+            await process.wait()
+
+        self._started = False
+
+
+def main():
+    """Entry point of a canary worker process."""
+    # warm up the bot library before a request arrives
+    from cogwatch.library import resolve
+
+    resolve(sys.argv[1] if len(sys.argv) > 1 else None)
+
+    sys.stdout.write('ready\n')
+    sys.stdout.flush()
+
+    request = json.loads(sys.stdin.readline())
+    path = request.get('path', [])
+    sys.path[:] = path + [entry for entry in sys.path if entry not in path]
+
+    # stray output from the cog must not end up in the result line
+    stdout, sys.stdout = sys.stdout, sys.stderr
+    result = run_canary(request['name'], request['memory'])
+    stdout.write(json.dumps(result) + '\n')
+    stdout.flush()
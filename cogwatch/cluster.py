@@ -0,0 +1,209 @@
+import asyncio
+import json
+import logging
+import os
+
+from cogwatch.control import bind_unix_socket
+
+try:
+    import fcntl
+except ImportError:
+    # Windows has neither `flock` nor Unix domain sockets
+    fcntl = None
+
+logger = logging.getLogger('cogwatch')
+
+ACTIONS = ('load', 'reload', 'unload', 'evict')
+
+
+class Cluster:
+    """Shares one file watcher between several bot processes on the same host.
+
+    Every process creates a `Cluster` on the same socket path. The first one to
+    take the lock file (`<path>.lock`) becomes the leader: it watches the
+    directory and forwards every batch of actions to the other processes, the
+    followers, which apply it through their own `Watcher`. If the leader exits,
+    the followers hold a new election and one of them takes over watching.
+
+    Messages are newline-delimited JSON. Followers introduce themselves with
+    `{"pid": ...}`, then answer each `{"actions": [[action, name], ...]}` batch
+    with `{"pid": ..., "results": [...]}`.
+    """
+
+    def __init__(self, watcher, path: str, timeout: float = 60.0):
+        if fcntl is None:
+            raise RuntimeError('`cluster_socket` is only supported on platforms with Unix domain sockets and `flock`.')
+
+        self.watcher = watcher
+        self.path = path
+        self.timeout = timeout
+        self.is_leader = False
+        self.followers = {}
+        self.last_results = {}
+        self._lock_file = None
+        self._server = None
+        self._follow_task = None
+        self._broadcast_lock = asyncio.Lock()
+
+    def try_lock(self) -> bool:
+        """Attempts to take the leader lock without blocking."""
+        lock_file = open(f'{self.path}.lock', 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+
+        self._lock_file = lock_file
+        return True
+
+    async def start(self) -> bool:
+        """Joins the cluster as either the leader or a follower. Returns whether this process leads."""
+        while not self.is_leader:
+            if self.try_lock():
+                break
+
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+            except OSError:
+                # the leader holds the lock but is not listening yet
+                await asyncio.sleep(0.1)
+                continue
+
+            logger.info(f'Following the cogwatch leader on {self.path}.')
+            self._follow_task = asyncio.create_task(self.follow(reader, writer))
+            return False
+
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+        self._server = await asyncio.start_unix_server(self.handle_follower, sock=bind_unix_socket(self.path))
+        self.is_leader = True
+        logger.info(f'Leading cogwatch processes on {self.path}.')
+        return True
+
+    async def close(self):
+        """Leaves the cluster, releasing the leader lock if this process holds it."""
+        if self._follow_task is not None:
+            self._follow_task.cancel()
+            self._follow_task = None
+
+        if self._server is not None:
+            self._server.close()
+            for _, writer in self.followers.values():
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+            self.followers.clear()
+
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+        self.is_leader = False
+
+    async def handle_follower(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Registers a follower; the connection is kept open for `broadcast`."""
+        try:
+            hello = json.loads(await reader.readline())
+            pid = int(hello['pid'])
+        except (ValueError, KeyError, TypeError):
+            writer.close()
+            return
+
+        self.followers[pid] = (reader, writer)
+        logger.info(f'Process {pid} joined as a follower.')
+
+    async def broadcast(self, actions: list) -> dict:
+        """Sends a batch to every follower, returning their results keyed by process id.
+
+        Followers that fail to answer within `timeout` seconds are dropped.
+        """
+        if not self.followers:
+            return {}
+
+        async def send(pid, reader, writer):
+            try:
+                writer.write(json.dumps({'actions': actions}).encode() + b'\n')
+                await writer.drain()
+                return pid, json.loads(await asyncio.wait_for(reader.readline(), self.timeout))['results']
+            except (OSError, ValueError, KeyError, asyncio.TimeoutError) as exc:
+                logger.error(f'Dropping follower {pid}: {exc!r}')
+                writer.close()
+                self.followers.pop(pid, None)
+                return pid, None
+
+        async with self._broadcast_lock:
+            responses = await asyncio.gather(*(send(pid, *streams) for pid, streams in list(self.followers.items())))
+
+        self.last_results = {pid: results for pid, results in responses if results is not None}
+        for pid, results in self.last_results.items():
+            failed = [result['name'] for result in results if not result['ok']]
+            if failed:
+                logger.error(f'Process {pid} failed to apply: {", ".join(failed)}')
+
+        return self.last_results
+
+    @staticmethod
+    def parse(message) -> list:
+        """Converts a batch from the leader into `(action, name)` tuples, raising ValueError if it is invalid."""
+        if not isinstance(message, dict) or not isinstance(message.get('actions'), list):
+            raise ValueError('batches must be a JSON object with an "actions" list')
+
+        actions = []
+        for item in message['actions']:
+            if not isinstance(item, list) or len(item) != 2 or not all(isinstance(part, str) for part in item):
+                raise ValueError('actions must be [action, name] pairs')
+            actions.append(tuple(item))
+
+        return actions
+
+    def normalize(self, actions: list) -> list:
+        """Adapts the leader's actions to the cogs this process has loaded."""
+        normalized = []
+        for action, name in actions:
+            if action not in ACTIONS:
+                continue
+            if action == 'reload' and name not in self.watcher.client.extensions:
+                action = 'load'
+            elif action == 'load' and name in self.watcher.client.extensions:
+                action = 'reload'
+            elif action == 'unload' and name not in self.watcher.client.extensions:
+                continue
+            normalized.append((action, name))
+
+        return normalized
+
+    async def follow(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Applies batches from the leader until it goes away, then holds a new election."""
+        try:
+            writer.write(json.dumps({'pid': os.getpid()}).encode() + b'\n')
+            await writer.drain()
+
+            while line := await reader.readline():
+                try:
+                    actions = self.parse(json.loads(line))
+                except ValueError as exc:
+                    # answer anyway, so the leader does not drop this process
+                    logger.error(f'Ignoring a malformed batch from the cogwatch leader: {exc}')
+                    response = {'pid': os.getpid(), 'results': [], 'error': str(exc)}
+                else:
+                    results = await self.watcher.apply(self.normalize(actions))
+                    response = {'pid': os.getpid(), 'results': results}
+
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except (OSError, ValueError, KeyError) as exc:
+            logger.error(f'Lost connection to the cogwatch leader: {exc!r}')
+        finally:
+            writer.close()
+
+        logger.info('The cogwatch leader went away, holding a new election.')
+        self._follow_task = None
+        if await self.start():
+            # applied batches never updated the digests or imports, so they
+            # are rebuilt from disk before this process starts watching
+            self.watcher.scan_dependencies()
+            self.watcher.start_watching()
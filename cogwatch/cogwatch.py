@@ -1,83 +1,58 @@
 import asyncio
 import collections
+import contextlib
+import hashlib
 import logging
 import os
+import py_compile
 import sys
+import time
 from functools import wraps
-from importlib import import_module
 from pathlib import Path
-from typing import Callable
+from typing import TYPE_CHECKING, Callable, List, Mapping, Optional, Sequence, Union
 
 from watchfiles import Change, awatch
 
+from cogwatch import git
+from cogwatch.admission import AdmissionController
+from cogwatch.canary import CanaryPool
+from cogwatch.cluster import Cluster
+from cogwatch.control import ControlServer
+from cogwatch.dependencies import DependencyGraph
+from cogwatch.drain import CommandDrain
+from cogwatch.events import EventStream, Subscription
+from cogwatch.filters import CogFilter
+from cogwatch.lazy import LazyLoader
+from cogwatch.leaks import LeakTracker
+from cogwatch.library import EXCEPTIONS, SUPPORTED_LIBRARIES, resolve
+from cogwatch.manifest import Manifest
+from cogwatch.metrics import Metrics
+from cogwatch.polling import Poller
+from cogwatch.snapshots import SnapshotFinder
+from cogwatch.sync import TreeSync
+
+if TYPE_CHECKING:
+    from discord.ext import commands
+
 logger = logging.getLogger('cogwatch')
 logger.addHandler(logging.NullHandler())
 # prevents log events bubbling up to the parent and duplicating output
 logger.propagate = False
 
-# We try to import the first available library that is supported. Note: the
-# library name does not neccessarily match the name of the module. For example:
-#
-# - 'discord.py' is imported as 'discord'.
-# - 'nextcord' is imported as 'nextcord'.
-# - 'disnake' is imported as 'disnake'.
-# - 'py-cord' is imported as 'discord'.
-# - 'discord.py-message-components' (discord4py) is imported as 'discord'.
-#
-# If you are adding support for a library, please ensure that the library name
-# works for both the commands extension and the base library.
-supported_libraries = ['discord', 'nextcord', 'disnake']
-
-for library_name in supported_libraries:
-    try:
-        library = import_module(library_name)
-        commands = import_module(f'{library_name}.ext.commands')
-    except ImportError:
-        logger.debug(f'Could not find {library_name} library, passing...')
-        pass
-    except Exception as e:
-        logger.error(
-            f'Failed to import {library_name} library. Please report this error here: https://github.com/robertwayne/cogwatch/issues'
-        )
-        raise e
-    else:
-        logger.info(f'Found {library_name}.')
-        globals()[library_name] = library
-        globals()[f'{library_name}.ext.commands'] = commands
-
-        break
-else:
-    raise ImportError(
-        'Could not find discord.py or another supported library, please install one of the following:\n'
-        + '\n'.join(supported_libraries)
-    )
-
-# We need to alias cog exceptions, as 'pycord' moves them to the base library
-# module whereas they are a part of the commands.ext module in other libraries.
-#
-# I'm not sure if there is a cleaner way to structure this, as it must be set
-# from a dynamically loaded library. It works for now, though.
-ExtensionNotLoaded = None
-NoEntryPointError = None
-ExtensionFailed = None
-ExtensionNotFound = None
-ExtensionAlreadyLoaded = None
-ExtensionError = None
-
-try:
-    ExtensionNotLoaded = commands.ExtensionNotLoaded
-    NoEntryPointError = commands.NoEntryPointError
-    ExtensionFailed = commands.ExtensionFailed
-    ExtensionNotFound = commands.ExtensionNotFound
-    ExtensionAlreadyLoaded = commands.ExtensionAlreadyLoaded
-    ExtensionError = commands.ExtensionError
-except AttributeError:
-    ExtensionNotLoaded = library.ExtensionNotLoaded
-    NoEntryPointError = library.NoEntryPointError
-    ExtensionFailed = library.ExtensionFailed
-    ExtensionNotFound = library.ExtensionNotFound
-    ExtensionAlreadyLoaded = library.ExtensionAlreadyLoaded
-    ExtensionError = library.ExtensionError
+# The supported library is resolved when the first `Watcher` is created (see
+# `cogwatch.library`), so that importing cogwatch stays cheap. The globals it
+# used to set on import are still available, and resolve it on first access.
+supported_libraries = SUPPORTED_LIBRARIES
+
+
+def __getattr__(name: str):
+    if name == 'commands':
+        return resolve().commands
+    if name == 'library':
+        return resolve().module
+    if name in EXCEPTIONS:
+        return getattr(resolve(), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
 class Watcher:
@@ -86,7 +61,11 @@ class Watcher:
     Attributes
         :client: A Bot client.
         :path: Root name of the cogs directory; cogwatch will only watch within
-               this directory -- recursively.
+               this directory -- recursively. Several directories can be
+               given as a list, or as a mapping of directory to the dotted
+               package it is imported as (ie. `{'../shared/cogs': 'shared'}`)
+               for directories outside the working directory. Changes across
+               all of them are watched together and applied as one batch.
         :debug: Whether to run the bot only when the debug flag is True.
                 Defaults to True.
         :loop: Custom event loop. If not specified, will use the current running
@@ -97,25 +76,203 @@ class Watcher:
                   to False.
         :colors: Whether to use colorized terminal outputs or not. Defaults to
                  True.
+        :lazy: Whether to defer loading each cog until one of its commands is
+               first used. Placeholder commands are registered on startup
+               instead, from a static scan of the cog files. Only prefix
+               commands can be detected; cogs without any, or with
+               application commands, are loaded immediately. Implies
+               `preload`. Defaults to False.
+        :manifest: Path of a file to persist discovered cogs, their load times
+                   and outcomes in between runs. Allows skipping the directory
+                   walk on startup when nothing changed, loading slow cogs
+                   first and skipping cogs that are known to be broken.
+                   Defaults to None.
+        :preload_concurrency: Maximum number of cogs loaded at the same time
+                              during preload. Defaults to 8.
+        :preload_order: Dotted cog paths to preload first, in order, before the
+                        rest are loaded concurrently. Defaults to None.
+        :debounce: Maximum time in milliseconds to group file changes into a
+                   single batch. Defaults to 1600.
+        :step: Quiet period in milliseconds; a batch is dispatched once no new
+               changes have arrived for this long. Defaults to 50.
+        :git_head: Whether to watch the git HEAD instead of the directory. When it
+                   moves (ie. after a `git pull`), the diff between the old and
+                   new commit is applied as a single batch. Defaults to False.
+        :polling: Whether to detect changes by polling the directory instead of
+                  relying on filesystem events, which never arrive on network
+                  mounts (NFS, SMB) and some container overlays. Only
+                  directories whose modification time changed are listed
+                  again. Defaults to False.
+        :poll_interval: Time in seconds between scans while files are changing.
+                        Defaults to 0.5.
+        :poll_max_interval: Time in seconds the interval grows to while nothing
+                            changes. Defaults to 5.
+        :include: Glob patterns of files to watch. Defaults to `('*.py',)`.
+        :exclude: Glob patterns of files to ignore, in addition to caches and
+                  editor swap files. Defaults to `()`.
+        :skip_unchanged: Whether to skip reloading cogs whose file contents have
+                         not changed since they were last loaded. Defaults to
+                         True.
+        :reload_dependents: Whether to track imports between files in the
+                            watched directory, reloading every cog that depends
+                            on a changed helper module. Defaults to True.
+        :precompile: Whether to compile changed files to bytecode in a worker
+                     thread before they are loaded, rejecting syntax errors
+                     without blocking the event loop. Defaults to True.
+        :rollback: Whether to restore the last successfully loaded version of a
+                   cog when reloading it fails and leaves it unloaded. Defaults
+                   to True.
+        :canary: Whether to try out changed cogs in a separate process before
+                 loading them, importing them and running their `setup` against
+                 a stub bot. Cogs that fail, hang or exceed the memory budget
+                 are not loaded. Defaults to False.
+        :canary_timeout: Time budget in seconds for a canary check. Defaults to
+                         10.
+        :canary_memory: Memory budget in megabytes for a canary check. Defaults
+                        to 512.
+        :canary_workers: Number of canary processes kept warm. Defaults to 2.
+        :graceful: Whether to let running commands of a cog finish before it
+                   is reloaded or unloaded. New invocations are held until the
+                   swap is done and then run against the new version. Defaults
+                   to False.
+        :drain_timeout: Maximum time in seconds to wait for running commands
+                        when `graceful` is set. Defaults to 30.
+        :sync_commands: Whether to sync the application command tree after each
+                        batch of changes, if its commands changed. Requires a
+                        client with a `tree` (ie. discord.py). Defaults to
+                        False.
+        :sync_guilds: Guild IDs whose guild-specific commands are synced
+                      alongside the global ones. Defaults to `()`.
+        :watch: Whether to watch the directory for file changes. Disable it to
+                only reload through the control socket. Defaults to True.
+        :control_socket: Path of a Unix domain socket to serve reload requests
+                         on, for triggering reloads without relying on file
+                         events. Served even when watching is disabled.
+                         Defaults to None.
+        :cluster_socket: Path of a Unix domain socket shared by several bot
+                         processes on one host. Only the process elected as
+                         leader watches the directory; it forwards every batch
+                         to the others. Defaults to None.
+        :track_leaks: Whether to keep weak references to the modules and cog
+                      instances replaced by reloads, so that ones which are
+                      never freed can be found with
+                      `Watcher.leak_tracker.report()`. Defaults to False.
+        :metrics_hook: Callable receiving `(phase, seconds, cog_dir)` for every
+                       recorded timing. Timings are also kept in memory on
+                       `Watcher.metrics`. Defaults to None.
+        :admission: Whether to pace extension operations so that a large batch
+                    cannot starve the event loop (and the gateway heartbeat).
+                    Operations are rate limited with a token bucket, and
+                    deferred while the measured event loop lag is above
+                    `lag_threshold`. Decisions are kept on
+                    `Watcher.admission`. Defaults to False.
+        :admission_rate: Average number of extension operations per second
+                         when `admission` is set. Defaults to 20.
+        :admission_burst: Number of operations allowed back-to-back before
+                          pacing starts. Defaults to 10.
+        :lag_threshold: Event loop lag in seconds above which operations are
+                        deferred. Defaults to 0.1.
+        :backend: Module name of the library to use (ie. `'nextcord'`). By
+                  default it is inferred from the client's class, or else the
+                  first installed supported library is used. Defaults to None.
     """
 
     def __init__(
         self,
-        client: commands.Bot,
-        path: str = 'commands',
+        client: 'commands.Bot',
+        path: Union[str, Sequence[str], Mapping[str, str]] = 'commands',
         debug: bool = True,
         loop: asyncio.BaseEventLoop = None,
         default_logger: bool = True,
         preload: bool = False,
         colors: bool = True,
+        lazy: bool = False,
+        manifest: Optional[str] = None,
+        preload_concurrency: int = 8,
+        preload_order: Optional[List[str]] = None,
+        debounce: int = 1600,
+        step: int = 50,
+        git_head: bool = False,
+        polling: bool = False,
+        poll_interval: float = 0.5,
+        poll_max_interval: float = 5.0,
+        include: Sequence[str] = ('*.py',),
+        exclude: Sequence[str] = (),
+        skip_unchanged: bool = True,
+        reload_dependents: bool = True,
+        precompile: bool = True,
+        rollback: bool = True,
+        canary: bool = False,
+        canary_timeout: float = 10.0,
+        canary_memory: int = 512,
+        canary_workers: int = 2,
+        graceful: bool = False,
+        drain_timeout: float = 30.0,
+        sync_commands: bool = False,
+        sync_guilds: Sequence[int] = (),
+        watch: bool = True,
+        control_socket: Optional[str] = None,
+        cluster_socket: Optional[str] = None,
+        track_leaks: bool = False,
+        metrics_hook: Optional[Callable[[str, float, Optional[str]], None]] = None,
+        admission: bool = False,
+        admission_rate: float = 20.0,
+        admission_burst: int = 10,
+        lag_threshold: float = 0.1,
+        backend: Optional[str] = None,
     ):
         self.client = client
+        self.library = resolve(backend, client)
         self.path = path
         self.debug = debug
         self.loop = loop
         self.default_logger = default_logger
         self.preload = preload
         self.colors = colors
+        self.lazy_loader = LazyLoader(self, self.library.commands) if lazy else None
+        self.manifest = Manifest(manifest) if manifest else None
+        self.preload_concurrency = preload_concurrency
+        self.preload_order = preload_order
+        self.debounce = debounce
+        self.step = step
+        self.git_head = git_head
+        self.polling = polling
+        self.poll_interval = poll_interval
+        self.poll_max_interval = poll_max_interval
+        self.poller = None
+        self.watch_filter = CogFilter(include, exclude)
+        self.skip_unchanged = skip_unchanged
+        self.precompile = precompile
+        self.rollback = rollback
+        self.canary_pool = None
+        if canary:
+            self.canary_pool = CanaryPool(
+                canary_workers, canary_timeout, canary_memory * 1024 * 1024, self.library.name
+            )
+        self.command_drain = CommandDrain(client, drain_timeout) if graceful else None
+        self.tree_sync = None
+        if sync_commands:
+            if getattr(client, 'tree', None) is not None:
+                self.tree_sync = TreeSync(client.tree, sync_guilds)
+            else:
+                logger.warning('`sync_commands` requires a client with an application command tree; ignoring it.')
+        self.watch = watch
+        self.control_socket = control_socket
+        self.control_server = None
+        self.cluster = Cluster(self, cluster_socket) if cluster_socket else None
+        self.metrics = Metrics(metrics_hook)
+        self.events = EventStream()
+        self.admission = AdmissionController(admission_rate, admission_burst, lag_threshold) if admission else None
+        self.leak_tracker = LeakTracker() if track_leaks else None
+
+        # content digests of the last loaded version of each cog, keyed by dotted path
+        self._digests = {}
+        self.dependency_graph = DependencyGraph() if reload_dependents else None
+        # (source, path) of the last version of each cog that loaded successfully
+        self._snapshots = {}
+        # the first error raised while running the current action on each cog
+        self._errors = {}
+        self._lock = asyncio.Lock()
 
         if self.colors:
             self.CEND = '\33[0m'
@@ -138,67 +295,474 @@ class Watcher:
         _path = os.path.normpath(path)
         return _path.split(os.sep)[-1:][0][:-3]
 
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @path.setter
+    def path(self, value: Union[str, Sequence[str], Mapping[str, str]]):
+        if isinstance(value, str):
+            paths = {value: None}
+        elif isinstance(value, Mapping):
+            paths = dict(value)
+        else:
+            paths = dict.fromkeys(value)
+
+        # the watched roots are resolved once, rather than on every event
+        self._path = next(iter(paths))
+        self._paths = list(paths)
+        self._cwd = Path.cwd()
+        self.roots = {}
+        for root_path, package in paths.items():
+            root = Path(os.path.normpath(self._cwd / root_path))
+            if package is None:
+                # roots within the working directory are imported by their relative path
+                relative = os.path.relpath(root, self._cwd)
+                if relative != os.curdir and not relative.startswith(os.pardir):
+                    package = '.'.join(relative.split(os.sep))
+            self.roots[root] = package
+
+        self.root = next(iter(self.roots))
+        self.invalidate_cog_dirs()
+
+    def packages(self) -> list:
+        """Returns `(root, package)` pairs of the roots with a known package, innermost roots first."""
+        packages = [(root, package) for root, package in self.roots.items() if package is not None]
+        return sorted(packages, key=lambda item: len(item[0].parts), reverse=True)
+
+    def describe_roots(self) -> str:
+        return ', '.join(f'{self.CBOLD}{root}{self.CEND}' for root in self.roots)
+
+    def invalidate_cog_dirs(self, path: Optional[str] = None):
+        """Drops a file from the cache of resolved extension names, or the whole cache if no path is given."""
+        if path is None:
+            self._cog_dirs = {}
+        else:
+            self._cog_dirs.pop(str(path), None)
+
     def get_dotted_cog_path(self, path: str) -> str:
         """Returns the full dotted path that discord.py uses to load cog files."""
         _path = os.path.normpath(path)
+
+        # files within a root map onto the root's package, followed by their relative path
+        absolute = _path if os.path.isabs(_path) else os.path.join(self._cwd, _path)
+        for root, package in self.packages():
+            relative = os.path.relpath(absolute, root)
+            if not relative.startswith(os.pardir):
+                return '.'.join([package, *relative.split(os.sep)[:-1]])
+
         tokens = _path.split(os.sep)
         reversed_tokens = list(reversed(tokens))
 
         # iterate over the list backwards in order to get the first occurrence in cases where a duplicate
         # name exists in the path (ie. example_proj/example_proj/commands)
+        for root_path in self._paths:
+            try:
+                root_index = reversed_tokens.index(root_path.split('/')[0]) + 1
+            except ValueError:
+                continue
+            return '.'.join([token for token in tokens[-root_index:-1]])
+
+        raise ValueError('Use forward-slash delimiter in your `path` parameter.')
+
+    def get_cog_dir(self, path: str) -> str:
+        """Returns the dotted extension name for a file path, ie. `commands.ping`.
+
+        Resolved names are cached per path until the file is deleted or
+        `invalidate_cog_dirs` is called.
+        """
+        key = str(path)
+        try:
+            return self._cog_dirs[key]
+        except KeyError:
+            pass
+
+        filename = self.get_cog_name(key)
+        new_dir = self.get_dotted_cog_path(key)
+        cog_dir = f'{new_dir}.{filename}' if new_dir else f'{self.path}.{filename}'
+        self._cog_dirs[key] = cog_dir
+        return cog_dir
+
+    @staticmethod
+    def file_digest(path: str):
+        """Returns a digest of the file contents, or None if it cannot be read."""
+        try:
+            with open(path, 'rb') as f:
+                return hashlib.blake2b(f.read(), digest_size=16).digest()
+        except OSError:
+            return None
+
+    @staticmethod
+    def get_module_name(cog_dir: str) -> str:
+        """Returns the importable module name for a cog, collapsing package `__init__` files."""
+        return cog_dir[: -len('.__init__')] if cog_dir.endswith('.__init__') else cog_dir
+
+    def update_dependencies(self, cog_dir: str, path: str):
+        """Re-parses a file's imports into the dependency graph."""
+        try:
+            with open(path, 'rb') as f:
+                source = f.read()
+        except OSError:
+            return
+
+        module = self.get_module_name(cog_dir)
+        self.dependency_graph.update(module, source, is_package=module != cog_dir)
+
+    def iter_cog_files(self):
+        """Yields every file in the watched directories that passes the watch filter."""
+        if self.manifest is not None:
+            files = self.manifest.walk(*self.roots, ignore_dirs=self.watch_filter.ignore_dirs)
+        else:
+            files = [file for root in self.roots for file in root.rglob('*.py')]
+
+        # nested roots would otherwise yield the same file twice
+        for file in dict.fromkeys(files):
+            if self.watch_filter(Change.added, str(file)):
+                yield file
+
+    def cached_digest(self, cog_dir: str, path):
+        """Returns a file's digest, reusing the one in the manifest if the file has not changed."""
+        digest = self.manifest.digest(cog_dir, path) if self.manifest is not None else None
+        return digest if digest is not None else self.file_digest(path)
+
+    async def update_manifest(self, results: list):
+        """Records the outcome of a batch in the manifest and saves it in the default executor."""
+        for result in results:
+            cog_dir = result['name']
+            if result['action'] in ('load', 'reload'):
+                path = self.get_cog_path(cog_dir)
+                if path is not None:
+                    digest = self._digests.get(cog_dir) if result['ok'] else None
+                    self.manifest.record(cog_dir, path, result['ok'], result['seconds'], digest)
+            elif result['action'] == 'unload' and result['ok']:
+                self.manifest.forget(cog_dir)
+
+        await asyncio.get_running_loop().run_in_executor(None, self.manifest.write, self.manifest.snapshot())
+
+    def is_helper(self, module: str) -> bool:
+        """Checks whether a tracked module is a plain helper rather than an extension."""
+        graph = self.dependency_graph
+        return graph is not None and module in graph.imports and not graph.is_extension(module)
+
+    def scan_dependencies(self):
+        """(Re)builds the content digests, and dependency graph if enabled, for every file in the watched directory."""
+        self._digests = {}
+        if self.dependency_graph is not None:
+            self.dependency_graph = DependencyGraph()
+
+        for file in self.iter_cog_files():
+            cog_dir = self.get_cog_dir(str(file))
+            self._digests[cog_dir] = self.cached_digest(cog_dir, file)
+            if self.dependency_graph is not None:
+                self.update_dependencies(cog_dir, file)
+
+    def coalesce_changes(self, changes) -> list:
+        """Reduces a batch of file changes to a single action per cog.
+
+        Editors and VCS operations often report a file as several changes in
+        one batch (ie. deleted + added + modified). Since the batch is an
+        unordered set, the final state on disk decides the action instead:
+        a cog that still exists is (re)loaded, and a missing one is unloaded.
+        If `skip_unchanged` is set, reloads of files whose contents match the
+        last loaded version are dropped. Cogs deferred by `lazy` only have their
+        placeholder commands refreshed.
+
+        When `reload_dependents` is set, changed helper modules (files without
+        a `setup` function) are evicted from `sys.modules` rather than loaded,
+        and every loaded cog importing a changed module is reloaded too.
+
+        Returns a list of `(action, cog_dir)` tuples, where action is one of
+        'unload', 'evict', 'load' or 'reload'. Unloads are ordered first so that
+        a moved cog frees its old name before being loaded under the new one,
+        then evictions, then loads in dependency order.
+        """
+        paths = {}
+        for _, change_path in changes:
+            paths[self.get_cog_dir(change_path)] = change_path
+
+        graph = self.dependency_graph
+        unloads, evictions, loads = [], set(), {}
+        changed, deleted = set(), set()
+
+        for cog_dir, change_path in sorted(paths.items()):
+            module = self.get_module_name(cog_dir)
+
+            # deferred cogs stay deferred; only their placeholders are refreshed
+            if self.lazy_loader is not None and self.lazy_loader.discard(cog_dir):
+                source = self.read_source(cog_dir)
+                if source is not None and self.lazy_loader.register(cog_dir, source[0]):
+                    continue
+
+            if not Path(change_path).exists():
+                self._digests.pop(cog_dir, None)
+                self.invalidate_cog_dirs(change_path)
+                if cog_dir in self.client.extensions:
+                    unloads.append(('unload', cog_dir))
+                elif graph is not None and module in graph.imports:
+                    evictions.add(module)
+                deleted.add(module)
+                continue
+
+            unchanged = self.skip_unchanged and self.is_unchanged(cog_dir, change_path)
+            if graph is not None and not unchanged:
+                self.update_dependencies(cog_dir, change_path)
+
+            if self.is_helper(module) and cog_dir not in self.client.extensions:
+                if not unchanged:
+                    # helpers are imported again by whichever cog needs them, so eviction is all it takes
+                    self._digests[cog_dir] = self.file_digest(change_path)
+                    evictions.add(module)
+                    changed.add(module)
+            elif cog_dir not in self.client.extensions:
+                loads[cog_dir] = 'load'
+                changed.add(module)
+            elif not unchanged:
+                loads[cog_dir] = 'reload'
+                changed.add(module)
+            else:
+                logger.debug(f'Skipping {cog_dir} because its contents have not changed.')
+
+        if graph is not None:
+            unloading = {cog_dir for _, cog_dir in unloads}
+            for module in graph.dependents(changed | deleted):
+                if module in self.client.extensions:
+                    if module not in unloading:
+                        loads.setdefault(module, 'reload')
+                elif not graph.is_extension(module):
+                    evictions.add(module)
+
+            for module in deleted:
+                graph.remove(module)
+
+            order = {module: i for i, module in enumerate(graph.order(map(self.get_module_name, loads)))}
+            ordered_loads = sorted(loads, key=lambda cog_dir: order[self.get_module_name(cog_dir)])
+        else:
+            ordered_loads = sorted(loads)
+
+        return (
+            unloads
+            + [('evict', module) for module in sorted(evictions)]
+            + [(loads[cog_dir], cog_dir) for cog_dir in ordered_loads]
+        )
+
+    def get_cog_path(self, cog_dir: str):
+        """Returns the source file for a dotted cog path, or None if it does not exist."""
+        module = self.get_module_name(cog_dir)
+        base = self._cwd.joinpath(*module.split('.'))
+        for root, package in self.packages():
+            if module.startswith(f'{package}.'):
+                base = root.joinpath(*module[len(package) + 1 :].split('.'))
+                break
+
+        for path in (base.with_name(f'{base.name}.py'), base / '__init__.py'):
+            if path.is_file():
+                return path
+        return None
+
+    @staticmethod
+    def compile_source(path: Path):
+        """Compiles a file into its `__pycache__` entry, returning the error if it fails.
+
+        The import system picks up the cached bytecode afterwards, so loading
+        the extension only has to unmarshal it rather than compile the source.
+        If writing bytecode is disabled (`sys.dont_write_bytecode`), the file
+        is only compiled in memory to check it.
+        """
+        if sys.dont_write_bytecode:
+            try:
+                compile(path.read_bytes(), str(path), 'exec', dont_inherit=True)
+            except (SyntaxError, ValueError) as exc:
+                return py_compile.PyCompileError(type(exc), exc, str(path))
+            except OSError as exc:
+                logger.debug(f'Could not read {path}: {exc}')
+            return None
+
         try:
-            root_index = reversed_tokens.index(self.path.split('/')[0]) + 1
-        except ValueError:
-            raise ValueError('Use forward-slash delimiter in your `path` parameter.')
+            py_compile.compile(str(path), doraise=True)
+        except py_compile.PyCompileError as exc:
+            return exc
+        except OSError as exc:
+            logger.debug(f'Could not write bytecode for {path}: {exc}')
+        return None
+
+    async def compile_actions(self, actions: list) -> list:
+        """Compiles every file touched by a batch in the default executor.
+
+        Loads and reloads of files that fail to compile are dropped from the
+        batch, so broken code never reaches the client.
+        """
+        loop = asyncio.get_running_loop()
+        paths = {cog_dir: self.get_cog_path(cog_dir) for action, cog_dir in actions if action != 'unload'}
+        paths = {cog_dir: path for cog_dir, path in paths.items() if path is not None}
+        errors = await asyncio.gather(*(loop.run_in_executor(None, self.compile_source, p) for p in paths.values()))
+
+        failed = set()
+        for cog_dir, exc in zip(paths, errors):
+            if exc is not None:
+                failed.add(cog_dir)
+                logger.info(
+                    f'{self.CBOLD}{self.CRED}[Error]{self.CEND} Failed to compile {self.CBOLD}{cog_dir}{self.CEND}; '
+                    f'{exc.exc_type_name}: {exc.exc_value}'
+                )
+
+        return [(action, cog_dir) for action, cog_dir in actions if action == 'evict' or cog_dir not in failed]
+
+    async def canary_actions(self, actions: list) -> dict:
+        """Tries out every load and reload of a batch in the canary pool.
+
+        Returns a dictionary mapping each rejected action to its error.
+        """
+        targets = [(action, cog_dir) for action, cog_dir in actions if action in ('load', 'reload')]
+        checks = await asyncio.gather(*(self.canary_pool.check(cog_dir) for _, cog_dir in targets))
+
+        errors = {}
+        for (action, cog_dir), error in zip(targets, checks):
+            if error is not None:
+                errors[(action, cog_dir)] = f'failed canary: {error}'
+                logger.info(
+                    f'{self.CBOLD}{self.CRED}[Error]{self.CEND} {self.CBOLD}{cog_dir}{self.CEND} failed its canary '
+                    f'check; {error}'
+                )
 
-        return '.'.join([token for token in tokens[-root_index:-1]])
+        return errors
+
+    def remember_digest(self, cog_dir: str):
+        """Records the digest of the version of a cog that was just loaded."""
+        path = self.get_cog_path(cog_dir)
+        if path is not None:
+            self._digests[cog_dir] = self.file_digest(path)
+
+    def is_unchanged(self, cog_dir: str, path: str) -> bool:
+        """Checks the file against the digest of the last loaded version of the cog.
+
+        The digest is only updated once a load or reload succeeds (see
+        `apply`), so a version that failed is retried when saved again.
+        """
+        digest = self.file_digest(path)
+        return digest is not None and self._digests.get(cog_dir) == digest
 
     async def _start(self):
         """Starts a watcher, monitoring for any file changes and dispatching event-related methods appropriately."""
-        while self.dir_exists():
+        if self.git_head:
+            return await self._start_git()
+
+        while True:
+            await self.wait_for_dir()
+
+            # a single watch covers every root, so changes across roots arrive in one batch
+            if self.polling:
+                self.poller = Poller(self.roots, self.watch_filter, self.poll_interval, self.poll_max_interval)
+                batches = self.poller.watch(debounce=self.debounce, step=self.step)
+            else:
+                batches = awatch(*self.roots, watch_filter=self.watch_filter, debounce=self.debounce, step=self.step)
+
             try:
-                async for changes in awatch(Path.cwd() / self.path):
+                async for changes in batches:
                     self.validate_dir()
+                    self.record_debounce(changes)
+                    try:
+                        await self.handle_changes(changes)
+                    except OSError as exc:
+                        logger.error(f'Failed to apply a batch of {len(changes)} change(s): {exc!r}')
+
+            except FileNotFoundError:
+                for root in self.roots:
+                    if not root.exists():
+                        logger.error(f'The path {self.CBOLD}{root}{self.CEND} no longer exists.')
+            except OSError as exc:
+                # ie. a root became unreadable; watching starts over after a pause
+                logger.error(f'Failed to watch {self.describe_roots()}: {exc!r}')
+                await asyncio.sleep(1)
 
-                    reverse_ordered_changes = sorted(changes, reverse=True)
+    async def _start_git(self):
+        """Watches the repository HEAD, applying the diff between the old and new commit whenever it moves."""
+        root = self.root
+        try:
+            git_dir = await git.rev_parse('--absolute-git-dir', cwd=root)
+            head = await git.rev_parse('HEAD', cwd=root)
+        except (git.GitError, OSError) as exc:
+            logger.error(f'Cannot watch the git HEAD of {self.CBOLD}{root}{self.CEND}: {exc}')
+            return
+
+        logger.info(f'Watching for commits in {self.CBOLD}{git_dir}{self.CEND}...')
+
+        async for _ in awatch(git_dir, watch_filter=git.is_ref_change, debounce=self.debounce, step=self.step):
+            try:
+                new_head = await git.rev_parse('HEAD', cwd=root)
+                if new_head == head:
+                    continue
 
-                    for change in reverse_ordered_changes:
-                        change_type = change[0]
-                        change_path = change[1]
+                changes = await git.diff_changes(head, new_head, *self.roots)
+            except (git.GitError, UnicodeDecodeError) as exc:
+                logger.error(f'Failed to read the git diff: {exc}')
+                continue
 
-                        filename = self.get_cog_name(change_path)
+            logger.info(f'HEAD moved from {head[:7]} to {new_head[:7]}; {len(changes)} file(s) changed.')
+            head = new_head
+            await self.handle_changes({change for change in changes if self.watch_filter(*change)})
 
-                        new_dir = self.get_dotted_cog_path(change_path)
-                        cog_dir = f'{new_dir}.{filename}' if new_dir else f'{self.path}.{filename}'
+    async def handle_changes(self, changes) -> list:
+        """Coalesces a batch of file changes and applies it, forwarding it to followers when leading a cluster."""
+        started = time.perf_counter()
+        actions = self.coalesce_changes(changes)
+        self.metrics.record('coalesce', time.perf_counter() - started)
 
-                        if change_type == Change.deleted:
-                            if cog_dir in self.client.extensions:
-                                await self.unload(cog_dir)
-                        elif change_type == Change.added:
-                            if cog_dir not in self.client.extensions:
-                                await self.load(cog_dir)
-                        elif change_type == Change.modified and change_type != (Change.added or Change.deleted):
-                            if cog_dir in self.client.extensions:
-                                await self.reload(cog_dir)
-                            else:
-                                await self.load(cog_dir)
+        if self.cluster is not None and self.cluster.is_leader:
+            results, _ = await asyncio.gather(self.apply(actions), self.cluster.broadcast(actions))
+            return results
 
-            except FileNotFoundError:
+        return await self.apply(actions)
+
+    def record_debounce(self, changes):
+        """Records how long the oldest write in a batch waited before being received."""
+        mtimes = []
+        for _, change_path in changes:
+            try:
+                mtimes.append(os.stat(change_path).st_mtime)
+            except OSError:
                 continue
 
-            else:
-                await asyncio.sleep(1)
+        if mtimes:
+            self.metrics.record('debounce', max(0.0, time.time() - min(mtimes)))
 
-        else:
-            await self.start()
+    async def wait_for_dir(self, max_delay: float = 30.0):
+        """Waits, without blocking the event loop, until every watched directory exists.
+
+        The closest existing parent directory is watched for a missing path to
+        appear. If it cannot be watched, the directory is polled with an
+        exponential backoff capped at `max_delay` seconds instead.
+        """
+        for target in self.roots:
+            delay = 0.1
+
+            while not target.exists():
+                parent = next((p for p in target.parents if p.exists()), None)
+
+                try:
+                    # only wake up for changes on the way to (or inside) the target
+                    async for _ in awatch(
+                        parent,
+                        watch_filter=lambda _, path: str(target).startswith(path) or path.startswith(str(target)),
+                        debounce=self.debounce,
+                        step=self.step,
+                        rust_timeout=5000,
+                        yield_on_timeout=True,
+                    ):
+                        if target.exists() or not parent.exists():
+                            break
+
+                except (OSError, RuntimeError, TypeError) as exc:
+                    logger.debug(f'Could not watch {parent} ({exc}), retrying in {delay:.1f}s.')
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, max_delay)
 
     def check_debug(self):
         """Determines if the watcher should be added to the event loop based on debug flags."""
         return any([(self.debug and __debug__), not self.debug])
 
     def dir_exists(self):
-        """Predicate method for checking whether the specified dir exists."""
-        return Path(Path.cwd() / self.path).exists()
+        """Predicate method for checking whether the specified dirs exist."""
+        return all(root.exists() for root in self.roots)
 
     def validate_dir(self):
         """Method for raising a FileNotFound error when the specified directory does not exist."""
@@ -208,23 +772,46 @@ class Watcher:
 
     async def start(self):
         """Checks for a user-specified event loop to start on, otherwise uses current running loop."""
-        _check = False
-        while not self.dir_exists():
-            if not _check:
-                logger.error(f'The path {self.CBOLD}{Path.cwd() / self.path}{self.CEND} does not exist.')
-                _check = True
+        if not self.dir_exists():
+            for root in self.roots:
+                if not root.exists():
+                    logger.error(f'The path {self.CBOLD}{root}{self.CEND} does not exist.')
+            await self.wait_for_dir()
 
-        else:
-            logger.info(f'Found {self.CBOLD}{Path.cwd() / self.path}{self.CEND}!')
-            if self.preload:
+        logger.info(f'Found {self.describe_roots()}!')
+        if self.manifest is not None:
+            self.manifest.load(*self.roots)
+
+        if self.dependency_graph is not None:
+            self.scan_dependencies()
+
+        if self.preload or self.lazy_loader is not None:
+            async with self.admission_batch():
                 await self._preload()
 
-            if self.check_debug():
-                if self.loop is None:
-                    self.loop = asyncio.get_event_loop()
+        if self.tree_sync is not None:
+            self.tree_sync.mark_synced()
+
+        if self.canary_pool is not None:
+            await self.canary_pool.start()
+
+        if self.control_socket is not None:
+            self.control_server = ControlServer(self)
+            await self.control_server.start(self.control_socket)
+
+        if self.cluster is not None and not await self.cluster.start():
+            return
 
-                logger.info(f'Watching for file changes in {self.CBOLD}{Path.cwd() / self.path}{self.CEND}...')
-                self.loop.create_task(self._start())
+        self.start_watching()
+
+    def start_watching(self):
+        """Schedules the file watcher on the event loop, if watching is enabled."""
+        if self.watch and self.check_debug():
+            if self.loop is None:
+                self.loop = asyncio.get_event_loop()
+
+            logger.info(f'Watching for file changes in {self.describe_roots()}...')
+            self.loop.create_task(self._start())
 
     async def handle_extension(self, func: Callable, cog_dir: str):
         """Handles the underlying logic for loading, unloading, and reloading
@@ -233,71 +820,330 @@ class Watcher:
 
         discord.py, for example, is async, but (most) of the other libraries are
         sync.
+
+        Every call is timed into `metrics` and published to `events`. When
+        `admission` is set, the call first waits to be admitted. Errors are
+        kept for `apply` to report.
+        """
+        phase = getattr(func, '__name__', 'extension').replace('_extension', '')
+        if self.admission is not None:
+            decision = await self.admission.admit(phase, cog_dir)
+            self.metrics.record('admission', decision['waited'], cog_dir)
+
+        started = time.perf_counter()
+        error = None
+        try:
+            future = func(cog_dir)
+
+            # We want to explicitly check if the future is an awaitable, as
+            # some of the libraries also return a list | dict type instead of
+            # None.
+            if future and isinstance(future, collections.abc.Awaitable):
+                await future
+        except BaseException as exc:
+            error = exc
+            self._errors.setdefault(cog_dir, f'{type(exc).__name__}: {exc}')
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            self.metrics.record(phase, seconds, cog_dir)
+            self.events.publish(phase, cog_dir, seconds, error)
+
+    def subscribe(self, maxsize: int = 256, overflow: str = 'drop_oldest') -> Subscription:
+        """Returns a subscription to the outcome of every load, reload and unload, as `ReloadEvent`s.
+
+        Iterate it with `async for`, and close it when done. A slow consumer
+        never holds up reloads; see `Subscription` for the `overflow` policies.
+        """
+        return self.events.subscribe(maxsize, overflow)
+
+    def admission_batch(self):
+        """Returns the context in which a batch of operations runs, which measures lag when `admission` is set."""
+        return self.admission.batch() if self.admission is not None else contextlib.nullcontext()
+
+    async def apply(self, actions: list) -> list:
+        """Runs a batch of `(action, cog_dir)` tuples in order.
+
+        Batches are run one at a time, whether they come from the file watcher
+        or the control socket. Actions rejected by `precompile` or `canary` are
+        skipped. If `sync_commands` is set, the application command tree is
+        synced once the batch is done.
+
+        Returns a result dictionary for every action, with the keys `action`,
+        `name`, `ok`, `seconds` and `error`.
+        """
+        async with self._lock, self.admission_batch():
+            errors = {}
+            if self.precompile:
+                started = time.perf_counter()
+                compiled = set(await self.compile_actions(actions))
+                self.metrics.record('compile', time.perf_counter() - started)
+                errors.update({item: 'failed to compile' for item in actions if item not in compiled})
+
+            if self.canary_pool is not None:
+                started = time.perf_counter()
+                errors.update(await self.canary_actions([item for item in actions if item not in errors]))
+                self.metrics.record('canary', time.perf_counter() - started)
+
+            results = []
+            for action, cog_dir in actions:
+                result = {'action': action, 'name': cog_dir, 'ok': False, 'seconds': 0.0, 'error': None}
+                if (action, cog_dir) in errors:
+                    result['error'] = errors[(action, cog_dir)]
+                    self.events.publish(action, cog_dir, error=result['error'], outcome='rejected')
+                else:
+                    self._errors.pop(cog_dir, None)
+                    started = time.perf_counter()
+                    result['ok'] = await self.dispatch(action, cog_dir)
+                    result['seconds'] = time.perf_counter() - started
+                    error = self._errors.pop(cog_dir, None)
+                    if not result['ok']:
+                        result['error'] = error or f'{action} failed'
+                    elif action in ('load', 'reload'):
+                        self.remember_digest(cog_dir)
+
+                results.append(result)
+
+            if self.manifest is not None:
+                await self.update_manifest(results)
+
+            # followers share the leader's commands, so only the leader syncs
+            following = self.cluster is not None and not self.cluster.is_leader
+            if self.tree_sync is not None and not following and any(result['ok'] for result in results):
+                started = time.perf_counter()
+                await self.tree_sync.sync()
+                self.metrics.record('sync', time.perf_counter() - started)
+
+            return results
+
+    async def dispatch(self, action: str, cog_dir: str) -> bool:
+        """Runs a single action returned by `coalesce_changes`. Returns whether it succeeded."""
+        if action == 'evict':
+            self.evict(cog_dir)
+            return True
+
+        if self.command_drain is not None and action in ('reload', 'unload'):
+            async with self.command_drain.drain(cog_dir):
+                return await getattr(self, action)(cog_dir)
+
+        return await getattr(self, action)(cog_dir)
+
+    @staticmethod
+    def evict(module: str):
+        """Removes a helper module from `sys.modules` so the next import picks up the new version.
+
+        The module is also removed from its parent package, as `from package
+        import module` would otherwise keep finding the old one there.
         """
-        future = func(cog_dir)
+        if sys.modules.pop(module, None) is None:
+            return
+
+        parent, _, child = module.rpartition('.')
+        if parent and hasattr(sys.modules.get(parent), child):
+            delattr(sys.modules[parent], child)
+        logger.debug(f'Evicted {module} from the module cache.')
+
+    def read_source(self, cog_dir: str):
+        """Returns `(source, path)` for a cog, or None if it cannot be read."""
+        path = self.get_cog_path(cog_dir)
+        if path is None:
+            return None
 
-        # We want to explicitly check if the future is an awaitable, as
-        # some of the libraries also return a list | dict type instead of
-        # None.
-        if future and isinstance(future, collections.abc.Awaitable):
-            await future
+        try:
+            return path.read_bytes(), str(path)
+        except OSError:
+            return None
+
+    async def load(self, cog_dir: str) -> bool:
+        """Loads a cog file into the client. Returns whether the cog was loaded."""
+        if self.lazy_loader is not None:
+            self.lazy_loader.discard(cog_dir)
 
-    async def load(self, cog_dir: str):
-        """Loads a cog file into the client."""
+        snapshot = self.read_source(cog_dir) if self.rollback else None
         try:
             await self.handle_extension(self.client.load_extension, cog_dir)
 
-        except ExtensionAlreadyLoaded:
+        except self.library.ExtensionAlreadyLoaded:
             logger.info(f'Cannot reload {cog_dir} because it is not loaded.')
-        except NoEntryPointError:
+        except self.library.NoEntryPointError:
             logger.info(
                 f'{self.CBOLD}{self.CRED}[Error]{self.CEND} Failed to load {self.CBOLD}{cog_dir}{self.CEND}; no entry point found.'
             )
-        except ExtensionNotFound:
+        except self.library.ExtensionNotFound:
             logger.debug(f'Cannot load {cog_dir} because it does not exist or is a folder.')
             pass
+        except Exception as exc:
+            self.cog_error(exc, self.library.ExtensionError)
         else:
             logger.info(f'{self.CBOLD}{self.CGREEN}[Cog Loaded]{self.CEND} {cog_dir}')
+            if snapshot is not None:
+                self._snapshots[cog_dir] = snapshot
+            return True
 
-    async def unload(self, cog_dir: str):
-        """Unloads a cog file into the client."""
+        return False
+
+    async def unload(self, cog_dir: str) -> bool:
+        """Unloads a cog file into the client. Returns whether the cog was unloaded."""
+        replaced = self.leak_tracker.capture(self.client, cog_dir) if self.leak_tracker is not None else None
         try:
             await self.handle_extension(self.client.unload_extension, cog_dir)
 
-        except ExtensionNotLoaded:
+        except self.library.ExtensionNotLoaded:
             logger.info(f'Cannot reload {cog_dir} because it is not loaded.')
         except Exception as exc:
-            self.cog_error(exc)
+            self.cog_error(exc, self.library.ExtensionError)
         else:
             logger.info(f'{self.CBOLD}{self.CRED}[Cog Unloaded]{self.CEND} {cog_dir}')
+            self._snapshots.pop(cog_dir, None)
+            if replaced is not None:
+                self.leak_tracker.track(cog_dir, replaced)
+            return True
+
+        return False
+
+    async def reload(self, cog_dir: str) -> bool:
+        """Attempts to atomically reload the file into the client. Returns whether the cog was reloaded.
 
-    async def reload(self, cog_dir: str):
-        """Attempts to atomically reload the file into the client."""
+        If the reload fails and `rollback` is set, the previous version of the
+        cog is restored.
+        """
+        snapshot = self.read_source(cog_dir) if self.rollback else None
+        replaced = self.leak_tracker.capture(self.client, cog_dir) if self.leak_tracker is not None else None
         try:
             await self.handle_extension(self.client.reload_extension, cog_dir)
 
-        except ExtensionNotLoaded:
+        except self.library.ExtensionNotLoaded:
             logger.info(
                 f'{self.CBOLD}{self.CRED}[Error]{self.CEND} Failed to reload {self.CBOLD}{cog_dir}{self.CEND}; no entry point found.'
             )
-        except ExtensionNotLoaded:
+        except self.library.ExtensionNotLoaded:
             logger.info(f'Cannot reload {cog_dir} because it is not loaded.')
         except Exception as exc:
-            self.cog_error(exc)
+            self.cog_error(exc, self.library.ExtensionError)
+            if self.rollback:
+                await self.restore(cog_dir)
         else:
             logger.info(f'{self.CBOLD}{self.CGREEN}[Cog Reloaded]{self.CEND} {cog_dir}')
+            if snapshot is not None:
+                self._snapshots[cog_dir] = snapshot
+            if replaced is not None:
+                self.leak_tracker.track(cog_dir, replaced)
+            return True
+
+        return False
+
+    async def restore(self, cog_dir: str) -> bool:
+        """Loads the last version of a cog that loaded successfully.
+
+        Some libraries already roll back a failed reload themselves; in that
+        case the cog is still loaded and nothing needs to be done. Returns
+        whether the previous version is loaded.
+        """
+        if cog_dir in self.client.extensions:
+            logger.info(f'{self.CBOLD}{cog_dir}{self.CEND} is still running its previous version.')
+            return True
+
+        snapshot = self._snapshots.get(cog_dir)
+        if snapshot is None:
+            return False
+
+        try:
+            with SnapshotFinder(cog_dir, *snapshot):
+                await self.handle_extension(self.client.load_extension, cog_dir)
+
+        except Exception as exc:
+            self.cog_error(exc, self.library.ExtensionError)
+            return False
+        else:
+            logger.info(f'{self.CBOLD}{self.CGREEN}[Cog Restored]{self.CEND} {cog_dir} (previous version)')
+            return True
 
     @staticmethod
-    def cog_error(exc: Exception):
+    def cog_error(exc: Exception, extension_error: Optional[type] = None):
         """Logs exceptions. TODO: Need thorough exception handling."""
-        if isinstance(exc, (ExtensionError, SyntaxError)):
+        if extension_error is None:
+            extension_error = resolve().ExtensionError
+        if isinstance(exc, (extension_error, SyntaxError)):
             logging.exception(exc)
+        else:
+            # libraries that do not wrap setup errors raise them as is
+            logger.error(f'{type(exc).__name__}: {exc}', exc_info=exc)
+
+    async def _preload(self) -> dict:
+        """Loads every cog in the watched directory.
+
+        Cogs listed in `preload_order` are loaded first, one at a time and in
+        the given order. The remaining cogs are loaded concurrently, at most
+        `preload_concurrency` at once.
 
-    async def _preload(self):
+        When `lazy` is set, cogs with detectable commands are deferred instead
+        and left out of the results. When `manifest` is set, the slowest cogs
+        are started first, and cogs that failed last time and have not changed
+        are only retried once every other cog has loaded.
+
+        Returns a dictionary mapping each dotted cog path to whether it loaded.
+        """
         logger.info('Preloading cogs...')
-        for cog in {(file.stem, file) for file in Path(Path.cwd() / self.path).rglob('*.py')}:
-            new_dir = self.get_dotted_cog_path(cog[1])
-            await self.load('.'.join([new_dir, cog[0]]))
+        started = time.perf_counter()
+
+        cogs, retries = [], []
+        for file in self.iter_cog_files():
+            cog_dir = self.get_cog_dir(str(file))
+            if self.is_helper(self.get_module_name(cog_dir)):
+                continue
+
+            self._digests[cog_dir] = self.cached_digest(cog_dir, file)
+            if self.manifest is not None and self.manifest.is_known_broken(cog_dir, file):
+                # the failure may have been transient (ie. a service that was down), so it is retried last
+                retries.append(cog_dir)
+                continue
+
+            if self.lazy_loader is not None and self.lazy_loader.register(cog_dir, file.read_bytes()):
+                continue
+
+            cogs.append(cog_dir)
+
+        priority = {cog_dir: i for i, cog_dir in enumerate(self.preload_order or ())}
+        ordered = sorted((cog_dir for cog_dir in cogs if cog_dir in priority), key=priority.get)
+        remaining = sorted(cog_dir for cog_dir in cogs if cog_dir not in priority)
+        if self.manifest is not None:
+            # start the slowest cogs first so they overlap with the rest
+            remaining.sort(key=lambda cog_dir: -self.manifest.duration(cog_dir))
+
+        results = {}
+        for cog_dir in ordered:
+            results[cog_dir] = await self.load(cog_dir)
+
+        semaphore = asyncio.Semaphore(max(1, self.preload_concurrency))
+
+        async def load(cog_dir):
+            async with semaphore:
+                return await self.load(cog_dir)
+
+        results.update(zip(remaining, await asyncio.gather(*(load(cog_dir) for cog_dir in remaining))))
+
+        for cog_dir in sorted(retries):
+            logger.info(f'Retrying {cog_dir}; it failed to load last time and has not changed since.')
+            results[cog_dir] = await self.load(cog_dir)
+
+        for cog_dir, ok in results.items():
+            if not ok:
+                # no version of the cog is loaded, so the next change to it is never skipped
+                self._digests.pop(cog_dir, None)
+
+        loaded = sum(results.values())
+        logger.info(f'Preloaded {loaded}/{len(results)} cogs in {time.perf_counter() - started:.2f}s.')
+
+        if self.manifest is not None:
+            timings = {cog_dir: self.metrics.histogram('load', cog_dir) for cog_dir in results}
+            await self.update_manifest(
+                [
+                    {'action': 'load', 'name': cog_dir, 'ok': ok, 'seconds': timings[cog_dir].samples[-1]}
+                    for cog_dir, ok in results.items()
+                ]
+            )
+
+        return results
 
 
 def watch(**kwargs):
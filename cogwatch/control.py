@@ -0,0 +1,149 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import stat
+
+logger = logging.getLogger('cogwatch')
+
+ACTIONS = ('load', 'reload', 'unload')
+
+
+def bind_unix_socket(path: str) -> socket.socket:
+    """Binds a Unix domain socket that only the current user can connect to.
+
+    The socket is created under a 077 umask rather than chmod'ed afterwards,
+    so there is no window in which other users could connect.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    umask = os.umask(0o077)
+    try:
+        sock.bind(path)
+    except OSError:
+        sock.close()
+        raise
+    finally:
+        os.umask(umask)
+
+    return sock
+
+
+class ControlServer:
+    """Serves reload requests for a `Watcher` on a Unix domain socket.
+
+    The protocol is newline-delimited JSON; every request line gets exactly one
+    response line. A request runs a single action or a batch of them:
+
+        {"action": "reload", "name": "commands.ping"}
+        {"action": "batch", "actions": [["unload", "commands.old"], ["load", "commands.new"]]}
+
+    Responses contain the results from `Watcher.apply`:
+
+        {"ok": true, "results": [{"action": "reload", "name": "commands.ping", "ok": true, ...}]}
+
+    Malformed requests are answered with `{"ok": false, "error": "..."}`.
+    """
+
+    def __init__(self, watcher):
+        self.watcher = watcher
+        self.server = None
+        self.path = None
+
+    async def start(self, path: str):
+        """Starts listening on the socket path, replacing a stale socket left by a previous run."""
+        try:
+            if stat.S_ISSOCK(os.stat(path).st_mode):
+                os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+        # only the bot's own user should be able to reload its code
+        self.server = await asyncio.start_unix_server(self.handle_client, sock=bind_unix_socket(path))
+        self.path = path
+        logger.info(f'Listening for reload requests on {path}.')
+
+    async def close(self):
+        """Stops the server and removes the socket file."""
+        if self.server is None:
+            return
+
+        self.server.close()
+        await self.server.wait_closed()
+        self.server = None
+
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def parse(request: dict) -> list:
+        """Converts a request into a list of `(action, name)` tuples, raising ValueError if it is invalid."""
+        if not isinstance(request, dict):
+            raise ValueError('request must be a JSON object')
+
+        if request.get('action') == 'batch':
+            actions = request.get('actions')
+            if not isinstance(actions, list):
+                raise ValueError('batch requests need an "actions" list')
+        else:
+            actions = [(request.get('action'), request.get('name'))]
+
+        parsed = []
+        for item in actions:
+            if not isinstance(item, (list, tuple)) or len(item) != 2:
+                raise ValueError('actions must be [action, name] pairs')
+
+            action, name = item
+            if action not in ACTIONS:
+                raise ValueError(f'unknown action {action!r}; expected one of {", ".join(ACTIONS)}')
+            if not isinstance(name, str) or not name:
+                raise ValueError('name must be a dotted extension path')
+
+            parsed.append((action, name))
+
+        return parsed
+
+    async def handle_request(self, line: bytes) -> dict:
+        try:
+            actions = self.parse(json.loads(line))
+        except ValueError as exc:
+            return {'ok': False, 'error': str(exc)}
+
+        results = await self.watcher.apply(actions)
+        return {'ok': all(result['ok'] for result in results), 'results': results}
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError) as exc:
+                    # the line was longer than the stream limit and has been discarded
+                    response = {'ok': False, 'error': f'request too long: {exc}'}
+                else:
+                    if not line:
+                        break
+                    if not line.strip():
+                        continue
+                    response = await self.handle_request(line)
+
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def send_request(path: str, request: dict) -> dict:
+    """Sends a single request to a control socket and returns the response."""
+    reader, writer = await asyncio.open_unix_connection(path)
+    try:
+        writer.write(json.dumps(request).encode() + b'\n')
+        await writer.drain()
+        return json.loads(await reader.readline())
+    finally:
+        writer.close()
+        await writer.wait_closed()
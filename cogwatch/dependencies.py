@@ -0,0 +1,135 @@
+import ast
+from typing import Iterable
+
+
+class DependencyGraph:
+    """A static import graph of the modules within the watched directory.
+
+    Modules are keyed by their dotted name (ie. `commands.utils`). Imports are
+    found by parsing the source, so nothing is executed. Only imports that
+    resolve to another module in the graph are treated as dependencies; third
+    party and standard library imports are ignored.
+    """
+
+    def __init__(self):
+        self.imports = {}
+        self.extensions = set()
+        # the reverse of `imports`: every name a module could import, mapped to the modules importing it
+        self.importers = {}
+
+    @staticmethod
+    def _candidates(tree: ast.AST, package: str) -> set:
+        """Returns every dotted name an import in the tree could refer to."""
+        names = set()
+
+        def add(dotted):
+            parts = dotted.split('.')
+            names.update('.'.join(parts[: i + 1]) for i in range(len(parts)))
+
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    add(alias.name)
+            elif isinstance(node, ast.ImportFrom):
+                if node.level:
+                    parts = package.split('.') if package else []
+                    base = parts[: len(parts) - node.level + 1]
+                    module = '.'.join(base + ([node.module] if node.module else []))
+                else:
+                    module = node.module
+
+                if not module:
+                    continue
+
+                add(module)
+                # `from package import module` imports a submodule, not an attribute
+                for alias in node.names:
+                    names.add(f'{module}.{alias.name}')
+
+        return names
+
+    @staticmethod
+    def _has_setup(tree: ast.Module) -> bool:
+        """Checks whether the module defines a top-level `setup` entry point."""
+        return any(
+            isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == 'setup' for node in tree.body
+        )
+
+    def update(self, name: str, source: bytes, is_package: bool = False):
+        """Parses a module's source and records its imports.
+
+        If the source cannot be parsed, previously recorded imports are kept.
+        New modules that fail to parse are assumed to be extensions so the
+        error surfaces when they are loaded.
+        """
+        try:
+            tree = ast.parse(source)
+        except (SyntaxError, ValueError):
+            if name not in self.imports:
+                self.imports[name] = set()
+                self.extensions.add(name)
+            return
+
+        package = name if is_package else name.rpartition('.')[0]
+        self._unlink(name)
+        self.imports[name] = self._candidates(tree, package)
+        for candidate in self.imports[name]:
+            self.importers.setdefault(candidate, set()).add(name)
+
+        if self._has_setup(tree):
+            self.extensions.add(name)
+        else:
+            self.extensions.discard(name)
+
+    def _unlink(self, name: str):
+        """Drops a module's recorded imports from `importers`."""
+        for candidate in self.imports.get(name, ()):
+            importers = self.importers.get(candidate)
+            if importers is not None:
+                importers.discard(name)
+                if not importers:
+                    del self.importers[candidate]
+
+    def remove(self, name: str):
+        """Removes a module from the graph."""
+        self._unlink(name)
+        self.imports.pop(name, None)
+        self.extensions.discard(name)
+
+    def is_extension(self, name: str) -> bool:
+        """Checks whether a module can be loaded as an extension."""
+        return name in self.extensions
+
+    def dependencies(self, name: str) -> set:
+        """Returns the modules in the graph that a module imports directly."""
+        return {dep for dep in self.imports.get(name, ()) if dep in self.imports and dep != name}
+
+    def dependents(self, names: Iterable[str]) -> set:
+        """Returns every module that transitively imports any of the given modules."""
+        found = set()
+        stack = [name for name in names if name in self.imports]
+        while stack:
+            name = stack.pop()
+            for module in self.importers.get(name, ()):
+                if module != name and module not in found:
+                    found.add(module)
+                    stack.append(module)
+
+        return found
+
+    def order(self, names: Iterable[str]) -> list:
+        """Sorts modules so that dependencies come before the modules importing them.
+
+        Ties are broken alphabetically. Import cycles are placed at the end in
+        alphabetical order.
+        """
+        remaining = set(names)
+        ordered = []
+        while remaining:
+            ready = sorted(name for name in remaining if not (self.dependencies(name) & remaining))
+            if not ready:
+                ready = sorted(remaining)
+            ordered.extend(ready)
+            remaining.difference_update(ready)
+
+        return ordered
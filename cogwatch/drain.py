@@ -0,0 +1,87 @@
+import asyncio
+import contextlib
+import logging
+from typing import Optional
+
+logger = logging.getLogger('cogwatch')
+
+
+class CommandDrain:
+    """Lets running commands finish before their cog is reloaded or unloaded.
+
+    Wraps the client's `invoke` method to count in-flight invocations per
+    extension. While a cog is draining, new invocations of its commands are
+    held back; once the cog has been swapped, they are resolved again so that
+    they run against the new version (or not at all, if it was unloaded).
+
+    Only invocations going through `Bot.invoke` are tracked, which covers
+    prefix and hybrid commands invoked by message.
+    """
+
+    def __init__(self, client, timeout: float = 30.0):
+        self.client = client
+        self.timeout = timeout
+        self.in_flight = {}
+        self.draining = {}
+        self._condition = asyncio.Condition()
+        self._invoke = client.invoke
+        client.invoke = self.invoke
+
+    def owner(self, command) -> Optional[str]:
+        """Returns the loaded extension a command was defined in, if any."""
+        module = getattr(command, 'module', None)
+        if module is None:
+            return None
+
+        for name in self.client.extensions:
+            if module == name or module.startswith(f'{name}.'):
+                return name
+        return None
+
+    async def invoke(self, ctx):
+        cog_dir = self.owner(ctx.command)
+
+        if cog_dir in self.draining:
+            await self.draining[cog_dir].wait()
+            ctx = await self.client.get_context(ctx.message)
+            cog_dir = self.owner(ctx.command)
+
+        if cog_dir is None:
+            return await self._invoke(ctx)
+
+        self.in_flight[cog_dir] = self.in_flight.get(cog_dir, 0) + 1
+        try:
+            return await self._invoke(ctx)
+        finally:
+            async with self._condition:
+                self.in_flight[cog_dir] -= 1
+                if not self.in_flight[cog_dir]:
+                    del self.in_flight[cog_dir]
+                self._condition.notify_all()
+
+    @contextlib.asynccontextmanager
+    async def drain(self, cog_dir: str):
+        """Holds new invocations of a cog and waits for running ones to finish.
+
+        Running invocations get up to `timeout` seconds; after that the body
+        runs anyway. Held invocations resume when the body exits.
+        """
+        released = self.draining.setdefault(cog_dir, asyncio.Event())
+        try:
+            if self.in_flight.get(cog_dir):
+                logger.info(f'Waiting for {self.in_flight[cog_dir]} running command(s) in {cog_dir} to finish...')
+                try:
+                    async with self._condition:
+                        await asyncio.wait_for(
+                            self._condition.wait_for(lambda: not self.in_flight.get(cog_dir)), self.timeout
+                        )
+                except asyncio.TimeoutError:
+                    logger.warning(
+                        f'{self.in_flight.get(cog_dir, 0)} command(s) in {cog_dir} still running after '
+                        f'{self.timeout}s; continuing anyway.'
+                    )
+
+            yield
+        finally:
+            self.draining.pop(cog_dir, None)
+            released.set()
@@ -0,0 +1,151 @@
+import asyncio
+import collections
+import logging
+import time
+from typing import Optional
+
+logger = logging.getLogger('cogwatch')
+
+# what happens when an event arrives for a subscriber whose queue is full
+OVERFLOW_POLICIES = ('drop_oldest', 'drop_newest', 'close')
+
+
+class ReloadEvent:
+    """The outcome of a single extension operation.
+
+    Attributes
+        :name: Dotted name of the extension, ie. `commands.ping`.
+        :operation: One of 'load', 'reload' or 'unload'.
+        :outcome: 'ok' if the operation succeeded, 'failed' if the client
+                  raised, or 'rejected' if `precompile` or `canary` stopped it
+                  before it reached the client.
+        :exception: The exception raised by the client, if any.
+        :error: A description of the failure, if any.
+        :duration: Time spent in the operation, in seconds.
+        :timestamp: Unix time at which the operation finished.
+    """
+
+    __slots__ = ('name', 'operation', 'outcome', 'exception', 'error', 'duration', 'timestamp')
+
+    def __init__(
+        self,
+        name: str,
+        operation: str,
+        outcome: str,
+        exception: Optional[BaseException] = None,
+        error: Optional[str] = None,
+        duration: float = 0.0,
+    ):
+        self.name = name
+        self.operation = operation
+        self.outcome = outcome
+        self.exception = exception
+        self.error = error
+        self.duration = duration
+        self.timestamp = time.time()
+
+    @property
+    def ok(self) -> bool:
+        return self.outcome == 'ok'
+
+    def __repr__(self) -> str:
+        return f'<ReloadEvent {self.operation} {self.name} {self.outcome} in {self.duration * 1000:.1f}ms>'
+
+
+class Subscription:
+    """A bounded queue of events for one consumer, iterated with `async for`.
+
+    Publishing never waits on a subscriber. Once `maxsize` events are queued,
+    `overflow` decides what happens to the next one: 'drop_oldest' discards the
+    oldest queued event, 'drop_newest' discards the new event, and 'close'
+    ends the subscription after the queued events. Dropped events are counted
+    in `dropped`.
+    """
+
+    def __init__(self, stream: 'EventStream', maxsize: int, overflow: str):
+        self.stream = stream
+        self.maxsize = max(1, maxsize)
+        self.overflow = overflow
+        self.queue = collections.deque()
+        self.dropped = 0
+        self.closed = False
+        self._ready = asyncio.Event()
+
+    def put(self, event: ReloadEvent):
+        if self.closed:
+            return
+
+        if len(self.queue) >= self.maxsize:
+            self.dropped += 1
+            if self.overflow == 'drop_newest':
+                return
+            if self.overflow == 'close':
+                logger.warning(f'Closing an event subscription that fell {self.maxsize} events behind.')
+                self.close()
+                return
+            self.queue.popleft()
+
+        self.queue.append(event)
+        self._ready.set()
+
+    def close(self):
+        """Unsubscribes; iteration ends once the queued events are consumed."""
+        self.closed = True
+        self.stream.subscribers.pop(self, None)
+        self._ready.set()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> ReloadEvent:
+        while not self.queue:
+            if self.closed:
+                raise StopAsyncIteration
+            self._ready.clear()
+            await self._ready.wait()
+
+        return self.queue.popleft()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class EventStream:
+    """Fans out `ReloadEvent`s to every subscriber."""
+
+    def __init__(self):
+        # insertion ordered set of subscriptions
+        self.subscribers = {}
+
+    def subscribe(self, maxsize: int = 256, overflow: str = 'drop_oldest') -> Subscription:
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f'overflow must be one of {", ".join(OVERFLOW_POLICIES)}, not {overflow!r}')
+
+        subscription = Subscription(self, maxsize, overflow)
+        self.subscribers[subscription] = None
+        return subscription
+
+    def publish(
+        self,
+        operation: str,
+        name: str,
+        duration: float = 0.0,
+        exception: Optional[BaseException] = None,
+        error: Optional[str] = None,
+        outcome: Optional[str] = None,
+    ):
+        """Queues an event for every subscriber, without waiting on any of them."""
+        if not self.subscribers:
+            return
+
+        if exception is not None and error is None:
+            error = f'{type(exception).__name__}: {exception}'
+        if outcome is None:
+            outcome = 'ok' if exception is None and error is None else 'failed'
+
+        event = ReloadEvent(name, operation, outcome, exception, error, duration)
+        for subscription in list(self.subscribers):
+            subscription.put(event)
@@ -0,0 +1,28 @@
+from pathlib import PurePath
+from typing import Sequence
+
+from watchfiles import Change, DefaultFilter
+
+
+class CogFilter(DefaultFilter):
+    """A watchfiles filter that only lets through changes to cog files.
+
+    Files must match at least one `include` glob and no `exclude` glob. Globs
+    are matched against the end of the path, so `*.py` matches any Python file
+    while `admin/*.py` only matches files directly inside an `admin` folder.
+    Caches, VCS folders and editor swap files are always ignored, as in
+    `watchfiles.DefaultFilter`.
+    """
+
+    def __init__(self, include: Sequence[str] = ('*.py',), exclude: Sequence[str] = ()):
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        super().__init__()
+
+    def matches(self, path: str) -> bool:
+        """Checks a path against the include and exclude globs only."""
+        _path = PurePath(path)
+        return any(_path.match(glob) for glob in self.include) and not any(_path.match(glob) for glob in self.exclude)
+
+    def __call__(self, change: Change, path: str) -> bool:
+        return self.matches(path) and super().__call__(change, path)
@@ -0,0 +1,65 @@
+import asyncio
+import os
+from pathlib import Path
+
+from watchfiles import Change
+
+# `git diff --name-status` letters mapped to file changes; renames are split
+# into a delete and an add by `--no-renames`
+STATUSES = {
+    'A': Change.added,
+    'C': Change.added,
+    'M': Change.modified,
+    'T': Change.modified,
+    'D': Change.deleted,
+}
+
+
+class GitError(Exception):
+    """Raised when a git command fails."""
+
+
+async def run_git(*args: str, cwd: Path) -> str:
+    """Runs a git command without blocking the event loop, returning its output.
+
+    Output is decoded like file names (`os.fsdecode`), so paths that are not
+    valid UTF-8 survive the round trip on POSIX.
+    """
+    process = await asyncio.create_subprocess_exec(
+        'git',
+        *args,
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise GitError(stderr.decode(errors='replace').strip())
+
+    return os.fsdecode(stdout)
+
+
+async def rev_parse(*args: str, cwd: Path) -> str:
+    return (await run_git('rev-parse', *args, cwd=cwd)).strip()
+
+
+async def diff_changes(old: str, new: str, *paths: Path) -> set:
+    """Returns the changes between two commits under `paths`, as `(Change, path)` tuples like watchfiles yields."""
+    cwd = paths[0]
+    toplevel = Path(await rev_parse('--show-toplevel', cwd=cwd))
+    output = await run_git('diff', '--name-status', '--no-renames', '-z', old, new, '--', *map(str, paths), cwd=cwd)
+
+    tokens = output.split('\0')
+    changes = set()
+    for status, file in zip(tokens[::2], tokens[1::2]):
+        change = STATUSES.get(status[:1])
+        if change is not None:
+            changes.add((change, os.path.normpath(toplevel / file)))
+
+    return changes
+
+
+def is_ref_change(_: Change, path: str) -> bool:
+    """watchfiles filter for files that change when HEAD moves."""
+    name = os.path.basename(path)
+    return name in ('HEAD', 'packed-refs') or f'{os.sep}refs{os.sep}heads{os.sep}' in path
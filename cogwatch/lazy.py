@@ -0,0 +1,166 @@
+import ast
+import asyncio
+import logging
+
+logger = logging.getLogger('cogwatch')
+
+COMMAND_DECORATORS = ('command', 'group')
+GROUP_DECORATORS = ('group',)
+# prefix command decorators are only recognised from these owners
+COMMAND_OWNERS = (None, 'commands')
+# markers of application commands, which have to be in the tree from the start; hybrid
+# commands are included, as their slash half is one
+APP_COMMAND_NAMES = (
+    'app_commands',
+    'slash_command',
+    'user_command',
+    'message_command',
+    'context_menu',
+    'GroupCog',
+    'hybrid_command',
+    'hybrid_group',
+)
+
+
+def _decorator_name(decorator: ast.expr):
+    """Returns `(owner, attribute)` for decorators like `@commands.command(...)`."""
+    func = decorator.func if isinstance(decorator, ast.Call) else decorator
+    if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+        return func.value.id, func.attr
+    if isinstance(func, ast.Name):
+        return None, func.id
+    return None, None
+
+
+def _keyword(decorator: ast.expr, name: str):
+    if isinstance(decorator, ast.Call):
+        for keyword in decorator.keywords:
+            if keyword.arg == name:
+                try:
+                    return ast.literal_eval(keyword.value)
+                except ValueError:
+                    return None
+    return None
+
+
+def uses_app_commands(tree: ast.AST) -> bool:
+    """Checks whether a module refers to application commands anywhere (ie. `app_commands` or `slash_command`)."""
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node.id in APP_COMMAND_NAMES:
+            return True
+        if isinstance(node, ast.Attribute) and node.attr in APP_COMMAND_NAMES:
+            return True
+        if isinstance(node, ast.ImportFrom) and node.module and 'app_commands' in node.module.split('.'):
+            return True
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            if any(alias.name.split('.')[-1] in APP_COMMAND_NAMES for alias in node.names):
+                return True
+    return False
+
+
+def scan_commands(source) -> dict:
+    """Finds the top-level prefix commands a cog defines, without importing it.
+
+    Returns a dictionary mapping each command name to its aliases. Subcommands
+    (`@group.command()`) are skipped, since invoking them goes through their
+    parent group anyway. Names computed at runtime cannot be detected.
+
+    Cogs that use application commands (including hybrid commands) return no
+    commands, so that they are loaded straight away; their commands must be in the tree before anyone
+    can invoke them.
+    """
+    tree = ast.parse(source)
+    if uses_app_commands(tree):
+        return {}
+
+    functions = [node for node in ast.walk(tree) if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))]
+
+    groups = {
+        function.name
+        for function in functions
+        for decorator in function.decorator_list
+        if _decorator_name(decorator)[1] in GROUP_DECORATORS
+    }
+
+    found = {}
+    for function in functions:
+        for decorator in function.decorator_list:
+            owner, attr = _decorator_name(decorator)
+            if attr not in COMMAND_DECORATORS or owner not in COMMAND_OWNERS or owner in groups:
+                continue
+
+            name = _keyword(decorator, 'name') or function.name
+            aliases = _keyword(decorator, 'aliases') or ()
+            found[name] = tuple(alias for alias in aliases if isinstance(alias, str))
+
+    return found
+
+
+class LazyLoader:
+    """Defers loading cogs until one of their commands is first invoked.
+
+    Each command found by `scan_commands` is registered on the client as a
+    placeholder. Invoking a placeholder removes every placeholder of that cog,
+    loads the real extension and processes the message again so it reaches
+    the real command. Only prefix commands can be detected this way; cogs
+    without any, or with application commands, are loaded straight away.
+    """
+
+    def __init__(self, watcher, commands_module):
+        self.watcher = watcher
+        self.commands = commands_module
+        self.pending = {}
+        self._locks = {}
+
+    def register(self, cog_dir: str, source) -> bool:
+        """Registers placeholders for a cog. Returns False if it has no detectable commands."""
+        try:
+            found = scan_commands(source)
+        except (SyntaxError, ValueError):
+            return False
+
+        if not found:
+            return False
+
+        client = self.watcher.client
+        names = []
+        for name, aliases in found.items():
+            if client.get_command(name) is not None:
+                logger.debug(f'Not registering a placeholder for {name}; the command already exists.')
+                continue
+
+            client.add_command(self.commands.Command(self.make_callback(cog_dir), name=name, aliases=list(aliases)))
+            names.append(name)
+
+        if not names:
+            return False
+
+        self.pending[cog_dir] = names
+        logger.info(f'{self.watcher.CBOLD}[Cog Deferred]{self.watcher.CEND} {cog_dir} ({", ".join(names)})')
+        return True
+
+    def make_callback(self, cog_dir: str):
+        async def placeholder(ctx):
+            if await self.activate(cog_dir):
+                await self.watcher.client.process_commands(ctx.message)
+
+        return placeholder
+
+    def discard(self, cog_dir: str) -> bool:
+        """Removes a cog's placeholders. Returns whether it had any."""
+        names = self.pending.pop(cog_dir, None)
+        if names is None:
+            return False
+
+        for name in names:
+            self.watcher.client.remove_command(name)
+        return True
+
+    async def activate(self, cog_dir: str) -> bool:
+        """Loads a deferred cog, replacing its placeholders. Returns whether it is loaded."""
+        lock = self._locks.setdefault(cog_dir, asyncio.Lock())
+        async with lock:
+            if cog_dir in self.watcher.client.extensions:
+                return True
+
+            return await self.watcher.load(cog_dir)
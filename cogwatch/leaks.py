@@ -0,0 +1,108 @@
+import gc
+import sys
+import types
+import weakref
+
+
+class LeakTracker:
+    """Tracks modules and cog instances replaced by reloads, to find ones that are never freed.
+
+    Every time a cog is reloaded or unloaded, weak references to its old module
+    and cog instances are kept as a new generation. `report` collects garbage
+    and lists the generations that are still alive, along with what refers to
+    them. A module surviving a reload usually means a task, listener or cache
+    still holds a closure from the old code.
+    """
+
+    def __init__(self):
+        self.generations = {}
+        self._refs = []
+
+    @staticmethod
+    def capture(client, cog_dir: str) -> list:
+        """Returns the module and cog instances currently loaded for an extension.
+
+        For package cogs (`commands.music.__init__`), cogs defined anywhere in
+        the package count as well.
+        """
+        # the same normalisation as `Watcher.get_module_name`
+        package = cog_dir[: -len('.__init__')] if cog_dir.endswith('.__init__') else cog_dir
+
+        objects = []
+        module = sys.modules.get(cog_dir, sys.modules.get(package))
+        if module is not None:
+            objects.append(module)
+
+        for cog in list(getattr(client, 'cogs', {}).values()):
+            name = type(cog).__module__
+            if name in (cog_dir, package) or name.startswith(f'{package}.'):
+                objects.append(cog)
+
+        return objects
+
+    def track(self, cog_dir: str, objects: list):
+        """Starts tracking objects that were just replaced or unloaded."""
+        generation = self.generations.get(cog_dir, 0) + 1
+        self.generations[cog_dir] = generation
+        for obj in objects:
+            try:
+                self._refs.append((cog_dir, generation, type(obj).__name__, weakref.ref(obj)))
+            except TypeError:
+                continue
+
+    @staticmethod
+    def size_of(obj) -> int:
+        """Returns a shallow estimate of the memory held by an object and its attributes."""
+        size = sys.getsizeof(obj)
+        namespace = getattr(obj, '__dict__', None)
+        if isinstance(namespace, dict):
+            size += sys.getsizeof(namespace) + sum(sys.getsizeof(value) for value in namespace.values())
+        return size
+
+    @staticmethod
+    def describe_referrers(obj, limit: int = 10) -> list:
+        """Returns short descriptions of the objects referring to `obj`."""
+        described = []
+        for referrer in gc.get_referrers(obj):
+            if isinstance(referrer, types.FrameType):
+                continue
+
+            if isinstance(referrer, types.FunctionType):
+                described.append(f'function {referrer.__module__}.{referrer.__qualname__}')
+            elif isinstance(referrer, dict):
+                described.append(f'dict with keys {list(referrer)[:5]}')
+            else:
+                described.append(type(referrer).__name__)
+
+            if len(described) >= limit:
+                break
+
+        return described
+
+    def report(self) -> list:
+        """Collects garbage and returns the tracked objects that are still alive.
+
+        Each entry is a dictionary with the `cog`, `generation`, `type`,
+        `size` (in bytes) and `referrers` of the object.
+        """
+        gc.collect()
+
+        alive = []
+        self._refs = [entry for entry in self._refs if entry[3]() is not None]
+        for cog_dir, generation, type_name, ref in self._refs:
+            obj = ref()
+            if obj is None:
+                continue
+
+            alive.append(
+                {
+                    'cog': cog_dir,
+                    'generation': generation,
+                    'type': type_name,
+                    'size': self.size_of(obj),
+                    'referrers': self.describe_referrers(obj),
+                }
+            )
+            del obj
+
+        return alive
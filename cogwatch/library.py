@@ -0,0 +1,105 @@
+import logging
+from importlib import import_module
+from typing import Optional
+
+logger = logging.getLogger('cogwatch')
+
+# Supported libraries, in the order they are probed. Note: the library name
+# does not neccessarily match the name of the module. For example:
+#
+# - 'discord.py' is imported as 'discord'.
+# - 'nextcord' is imported as 'nextcord'.
+# - 'disnake' is imported as 'disnake'.
+# - 'py-cord' is imported as 'discord'.
+# - 'discord.py-message-components' (discord4py) is imported as 'discord'.
+#
+# If you are adding support for a library, please ensure that the library name
+# works for both the commands extension and the base library.
+SUPPORTED_LIBRARIES = ['discord', 'nextcord', 'disnake']
+
+# the exceptions aliased on every `Library`
+EXCEPTIONS = (
+    'ExtensionNotLoaded',
+    'NoEntryPointError',
+    'ExtensionFailed',
+    'ExtensionNotFound',
+    'ExtensionAlreadyLoaded',
+    'ExtensionError',
+)
+
+# resolved libraries keyed by module name, plus the result of probing under None
+_cache = {}
+
+
+class Library:
+    """The base module and commands extension of a supported library, with its extension exceptions aliased.
+
+    The exceptions need aliasing, as 'pycord' moves them to the base library
+    module whereas they are a part of the commands.ext module in other
+    libraries.
+    """
+
+    def __init__(self, name: str, module, commands):
+        self.name = name
+        self.module = module
+        self.commands = commands
+
+        source = commands if hasattr(commands, 'ExtensionNotLoaded') else module
+        for exception in EXCEPTIONS:
+            setattr(self, exception, getattr(source, exception))
+
+    @classmethod
+    def load(cls, name: str) -> 'Library':
+        return cls(name, import_module(name), import_module(f'{name}.ext.commands'))
+
+
+def infer(client) -> Optional[str]:
+    """Returns the library a client's class (or one of its bases) comes from, if it is a supported one."""
+    for klass in type(client).__mro__:
+        name = klass.__module__.split('.')[0]
+        if name in SUPPORTED_LIBRARIES:
+            return name
+    return None
+
+
+def probe() -> Library:
+    """Imports the first supported library that is installed."""
+    for name in SUPPORTED_LIBRARIES:
+        try:
+            library = Library.load(name)
+        except ImportError:
+            logger.debug(f'Could not find {name} library, passing...')
+            pass
+        except Exception as e:
+            logger.error(
+                f'Failed to import {name} library. Please report this error here: https://github.com/robertwayne/cogwatch/issues'
+            )
+            raise e
+        else:
+            logger.info(f'Found {name}.')
+            return library
+
+    raise ImportError(
+        'Could not find discord.py or another supported library, please install one of the following:\n'
+        + '\n'.join(SUPPORTED_LIBRARIES)
+    )
+
+
+def resolve(backend: Optional[str] = None, client=None) -> Library:
+    """Returns the library to use, importing it on first use.
+
+    An explicit `backend` module name is imported as is. Otherwise the library
+    is inferred from the client's class, falling back to probing every
+    supported library in order. Results are cached for the process.
+    """
+    name = backend or (infer(client) if client is not None else None)
+
+    try:
+        return _cache[name]
+    except KeyError:
+        pass
+
+    library = Library.load(name) if name is not None else probe()
+    _cache[name] = library
+    _cache.setdefault(library.name, library)
+    return library
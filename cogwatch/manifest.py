@@ -0,0 +1,147 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Iterable, Optional
+
+logger = logging.getLogger('cogwatch')
+
+VERSION = 2
+
+
+class Manifest:
+    """A record of the watched directories that persists between runs.
+
+    Stores the modification time of every directory in the tree, plus the
+    size, modification time, last load duration and outcome of every cog. On
+    the next start this allows:
+
+    - skipping the directory walk when no directory has changed, since adding,
+      removing or renaming a file always updates its parent directory;
+    - loading the slowest cogs first, for better concurrency;
+    - retrying cogs that failed to load last time and have not been touched
+      only after every other cog has loaded.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.dirs = {}
+        self.files = []
+        self.cogs = {}
+        self.roots = None
+
+    def load(self, *roots: Path):
+        """Reads the manifest from disk, discarding it if it belongs to other directories or another version."""
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+
+        if data.get('version') != VERSION or data.get('roots') != list(map(str, roots)):
+            logger.debug(f'Ignoring the manifest at {self.path}; it does not match {", ".join(map(str, roots))}.')
+            return
+
+        self.roots = data['roots']
+        self.dirs = data.get('dirs', {})
+        self.files = data.get('files', [])
+        self.cogs = data.get('cogs', {})
+
+    def save(self):
+        self.write(self.snapshot())
+
+    def snapshot(self) -> dict:
+        """Returns a copy of the manifest's data that `write` can save from another thread."""
+        return {
+            'version': VERSION,
+            'roots': self.roots,
+            'dirs': dict(self.dirs),
+            'files': list(self.files),
+            'cogs': dict(self.cogs),
+        }
+
+    def write(self, data: dict):
+        tmp = self.path.with_name(f'{self.path.name}.tmp')
+        try:
+            tmp.write_text(json.dumps(data, indent=1, sort_keys=True))
+            os.replace(tmp, self.path)
+        except OSError as exc:
+            logger.error(f'Failed to save the manifest to {self.path}: {exc}')
+
+    def is_fresh(self) -> bool:
+        """Checks whether every recorded directory still has the same modification time."""
+        if not self.dirs:
+            return False
+
+        for directory, mtime in self.dirs.items():
+            try:
+                if os.stat(directory).st_mtime_ns != mtime:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def walk(self, *roots: Path, ignore_dirs: Iterable[str] = ()) -> list:
+        """Returns every `.py` file under the roots, from the manifest if the trees have not changed.
+
+        Directories named in `ignore_dirs` (ie. `__pycache__`) are not
+        entered, as writing bytecode would otherwise make the tree look
+        changed on every start.
+        """
+        ignore_dirs = frozenset(ignore_dirs)
+        if self.roots == list(map(str, roots)) and self.is_fresh():
+            return [Path(file) for file in self.files]
+
+        self.roots = list(map(str, roots))
+        self.dirs = {}
+        self.files = []
+        for root in roots:
+            for directory, dirnames, filenames in os.walk(root):
+                dirnames[:] = [name for name in dirnames if name not in ignore_dirs]
+                self.dirs[directory] = os.stat(directory).st_mtime_ns
+                self.files.extend(os.path.join(directory, name) for name in filenames if name.endswith('.py'))
+
+        return [Path(file) for file in self.files]
+
+    def is_fresh_entry(self, cog_dir: str, path) -> bool:
+        """Checks whether a cog's file is unchanged since it was recorded."""
+        entry = self.cogs.get(cog_dir)
+        if entry is None:
+            return False
+
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        return entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size
+
+    def is_known_broken(self, cog_dir: str, path) -> bool:
+        """Checks whether a cog failed to load last time and has not changed since."""
+        return self.is_fresh_entry(cog_dir, path) and not self.cogs[cog_dir]['ok']
+
+    def duration(self, cog_dir: str) -> float:
+        return self.cogs.get(cog_dir, {}).get('duration', 0.0)
+
+    def digest(self, cog_dir: str, path) -> Optional[bytes]:
+        """Returns the recorded content digest of a cog if its file is unchanged."""
+        if self.is_fresh_entry(cog_dir, path) and self.cogs[cog_dir].get('digest'):
+            return bytes.fromhex(self.cogs[cog_dir]['digest'])
+        return None
+
+    def record(self, cog_dir: str, path, ok: bool, duration: float, digest: Optional[bytes] = None):
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.forget(cog_dir)
+            return
+
+        self.cogs[cog_dir] = {
+            'path': str(path),
+            'mtime_ns': st.st_mtime_ns,
+            'size': st.st_size,
+            'digest': digest.hex() if digest else None,
+            'duration': duration,
+            'ok': ok,
+        }
+
+    def forget(self, cog_dir: str):
+        self.cogs.pop(cog_dir, None)
@@ -0,0 +1,109 @@
+import bisect
+import collections
+import logging
+from typing import Callable, Optional
+
+logger = logging.getLogger('cogwatch')
+
+# upper bounds, in seconds, of the histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+
+class Histogram:
+    """Distribution of durations for a single phase.
+
+    Counts are kept per bucket for the lifetime of the histogram, while
+    percentiles are calculated from the most recent `window` samples.
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS, window: int = 1024):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.samples = collections.deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        """Records a duration in seconds."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Returns the q-th percentile (0-100) of the recent samples."""
+        if not self.samples:
+            return 0.0
+
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def summary(self) -> dict:
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': self.max,
+        }
+
+
+class Metrics:
+    """In-memory collector for reload timings.
+
+    Durations are recorded per phase and, when the phase belongs to a single
+    cog, per cog as well. Phases recorded by the `Watcher`:
+
+    - `debounce`: time from the oldest write in a batch until cogwatch received it.
+    - `coalesce`: time spent reducing a batch of file changes to actions.
+    - `compile`: time spent compiling a batch to bytecode.
+    - `canary`: time spent trying out a batch in canary processes.
+    - `load`, `reload`, `unload`: time spent in the client's extension methods,
+      which covers importing, tearing down and setting up the cog.
+    - `sync`: time spent syncing the application command tree after a batch.
+    - `admission`: time an extension operation waited to be admitted, when
+      admission control is enabled.
+
+    An optional `hook` is called with `(phase, seconds, cog_dir)` for every
+    recorded duration, for forwarding to an external metrics system.
+    """
+
+    def __init__(self, hook: Optional[Callable[[str, float, Optional[str]], None]] = None):
+        self.hook = hook
+        self.phases = {}
+        self.cogs = {}
+
+    def record(self, phase: str, seconds: float, cog_dir: Optional[str] = None):
+        """Records a duration, then passes it on to the hook."""
+        self.phases.setdefault(phase, Histogram()).observe(seconds)
+        if cog_dir is not None:
+            self.cogs.setdefault((phase, cog_dir), Histogram()).observe(seconds)
+
+        if self.hook is not None:
+            try:
+                self.hook(phase, seconds, cog_dir)
+            except Exception:
+                logger.exception(f'Metrics hook failed while recording {phase}.')
+
+    def histogram(self, phase: str, cog_dir: Optional[str] = None) -> Optional[Histogram]:
+        """Returns the histogram for a phase, optionally narrowed to one cog."""
+        if cog_dir is not None:
+            return self.cogs.get((phase, cog_dir))
+        return self.phases.get(phase)
+
+    def slowest(self, phase: str, limit: int = 10) -> list:
+        """Returns `(cog_dir, max_seconds)` pairs for the slowest cogs in a phase."""
+        cogs = [(cog_dir, h.max) for (p, cog_dir), h in self.cogs.items() if p == phase]
+        return sorted(cogs, key=lambda item: item[1], reverse=True)[:limit]
+
+    def summary(self) -> dict:
+        """Returns summary statistics for every recorded phase."""
+        return {phase: histogram.summary() for phase, histogram in self.phases.items()}
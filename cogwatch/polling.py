@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, Iterable, Optional
+
+from watchfiles import Change
+
+logger = logging.getLogger('cogwatch')
+
+# directories modified this recently may still change within the same mtime
+# tick, so their listing is not trusted on the next scan
+RACY_NS = 2_000_000_000
+
+
+class Poller:
+    """Detects file changes by polling, for filesystems without change notifications (NFS, SMB, some overlays).
+
+    An in-memory index keeps the `(mtime_ns, size, inode)` of every watched
+    file and the modification time and entries of every directory. Adding,
+    removing or renaming an entry updates its directory's modification time,
+    so a directory is only listed again with `os.scandir` when that changed;
+    otherwise its known files are stat'ed directly and its known
+    subdirectories are descended into. Directories ignored by the watch
+    filter (caches, VCS folders) are never entered.
+
+    The interval between scans starts at `interval` and grows while nothing
+    changes, up to `max_interval`. It never drops below ten times the
+    duration of the last scan, so polling a large or slow tree stays cheap.
+    """
+
+    def __init__(
+        self,
+        roots: Iterable,
+        watch_filter: Optional[Callable[[Change, str], bool]] = None,
+        interval: float = 0.5,
+        max_interval: float = 5.0,
+    ):
+        self.roots = [str(root) for root in roots]
+        self.watch_filter = watch_filter
+        self.interval = interval
+        self.max_interval = max_interval
+        self.ignore_dirs = frozenset(getattr(watch_filter, 'ignore_dirs', ()))
+        # path -> (mtime_ns, size, inode)
+        self.files = {}
+        # path -> (mtime_ns or None if untrusted, file paths, subdirectory paths)
+        self.dirs = {}
+        self.scan_seconds = 0.0
+
+    def accepts(self, path: str) -> bool:
+        return self.watch_filter is None or self.watch_filter(Change.modified, path)
+
+    def list_dir(self, path: str, mtime_ns: int) -> tuple:
+        files, subdirs = [], []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in self.ignore_dirs:
+                        subdirs.append(entry.path)
+                elif entry.is_file() and self.accepts(entry.path):
+                    files.append(entry.path)
+
+        trusted = time.time_ns() - mtime_ns > RACY_NS
+        self.dirs[path] = (mtime_ns if trusted else None, files, subdirs)
+        return files, subdirs
+
+    def keep_known(self, path: str, seen_files: set, seen_dirs: set):
+        """Marks what is known under an unreadable directory as seen, so it is not reported as deleted."""
+        known = self.dirs.get(path)
+        if known is None:
+            return
+
+        seen_dirs.add(path)
+        seen_files.update(file for file in known[1] if file in self.files)
+        for subdir in known[2]:
+            self.keep_known(subdir, seen_files, seen_dirs)
+
+    def scan_dir(self, path: str, changes: set, seen_files: set, seen_dirs: set):
+        mtime_ns = os.stat(path).st_mtime_ns
+        seen_dirs.add(path)
+
+        known = self.dirs.get(path)
+        if known is not None and known[0] == mtime_ns:
+            files, subdirs = known[1], known[2]
+        else:
+            files, subdirs = self.list_dir(path, mtime_ns)
+
+        for file in files:
+            try:
+                st = os.stat(file)
+            except FileNotFoundError:
+                continue
+            except OSError as exc:
+                logger.debug(f'Skipping {file}; it cannot be read ({exc}).')
+                if file in self.files:
+                    seen_files.add(file)
+                continue
+
+            signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+            previous = self.files.get(file)
+            if previous is None:
+                changes.add((Change.added, file))
+            elif previous != signature:
+                changes.add((Change.modified, file))
+            self.files[file] = signature
+            seen_files.add(file)
+
+        for subdir in subdirs:
+            try:
+                self.scan_dir(subdir, changes, seen_files, seen_dirs)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            except OSError as exc:
+                logger.debug(f'Skipping {subdir}; it cannot be read ({exc}).')
+                self.keep_known(subdir, seen_files, seen_dirs)
+
+    def scan(self) -> set:
+        """Updates the index, returning the changes since the last scan as `(Change, path)` tuples.
+
+        Raises FileNotFoundError if a root no longer exists, or another OSError
+        if a root cannot be read. Unreadable entries below the roots are skipped.
+        """
+        started = time.perf_counter()
+        changes, seen_files, seen_dirs = set(), set(), set()
+        for root in self.roots:
+            self.scan_dir(root, changes, seen_files, seen_dirs)
+
+        for file in self.files.keys() - seen_files:
+            del self.files[file]
+            changes.add((Change.deleted, file))
+        for directory in self.dirs.keys() - seen_dirs:
+            del self.dirs[directory]
+
+        self.scan_seconds = time.perf_counter() - started
+        return changes
+
+    def reset(self):
+        self.files = {}
+        self.dirs = {}
+
+    async def watch(self, debounce: int = 1600, step: int = 50):
+        """Yields batches of changes, like `watchfiles.awatch`.
+
+        Scans run in the default executor, as stat calls on network mounts can
+        be slow. Once a scan finds changes, the tree is rescanned every `step`
+        milliseconds until it settles or `debounce` milliseconds have passed,
+        and the changes are yielded as one batch.
+        """
+        loop = asyncio.get_running_loop()
+        self.reset()
+        await loop.run_in_executor(None, self.scan)
+        interval = self.interval
+
+        while True:
+            await asyncio.sleep(max(interval, self.scan_seconds * 10))
+            changes = await loop.run_in_executor(None, self.scan)
+            if not changes:
+                interval = min(self.max_interval, interval * 1.5)
+                continue
+
+            deadline = loop.time() + debounce / 1000
+            while loop.time() < deadline:
+                await asyncio.sleep(step / 1000)
+                settled = await loop.run_in_executor(None, self.scan)
+                if not settled:
+                    break
+                changes |= settled
+
+            logger.debug(f'Polling found {len(changes)} change(s); last scan took {self.scan_seconds * 1000:.1f}ms.')
+            interval = self.interval
+            yield changes
@@ -0,0 +1,48 @@
+import importlib.abc
+import importlib.util
+import os
+import sys
+
+
+class SnapshotFinder(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    """Serves a saved version of a module's source to the import system.
+
+    While installed, importing `name` executes the snapshot instead of the
+    file currently on disk. Use it as a context manager so that it is only in
+    place for the duration of a single load:
+
+        with SnapshotFinder('commands.ping', source, path):
+            client.load_extension('commands.ping')
+    """
+
+    def __init__(self, name: str, source: bytes, origin: str):
+        self.name = name
+        self.source = source
+        self.origin = origin
+
+    def find_spec(self, fullname, path=None, target=None):
+        if fullname != self.name:
+            return None
+
+        # a package's `__init__` file, unless it is imported under its own `.__init__` name
+        is_package = os.path.basename(self.origin) == '__init__.py' and not fullname.endswith('.__init__')
+        spec = importlib.util.spec_from_loader(fullname, self, origin=self.origin, is_package=is_package)
+        if is_package:
+            spec.submodule_search_locations.append(os.path.dirname(self.origin))
+        return spec
+
+    def create_module(self, spec):
+        return None
+
+    def exec_module(self, module):
+        module.__file__ = self.origin
+        exec(compile(self.source, self.origin, 'exec'), module.__dict__)
+
+    def __enter__(self):
+        # the module may be cached from the failed attempt, which would bypass the finder
+        sys.modules.pop(self.name, None)
+        sys.meta_path.insert(0, self)
+        return self
+
+    def __exit__(self, *exc):
+        sys.meta_path.remove(self)
@@ -0,0 +1,67 @@
+import json
+import logging
+from typing import Iterable, Optional
+
+logger = logging.getLogger('cogwatch')
+
+
+class Snowflake:
+    """Minimal stand-in for `discord.Object`; the command tree only reads the id."""
+
+    def __init__(self, id: int):
+        self.id = id
+
+
+class TreeSync:
+    """Syncs the client's application command tree once per batch, only when it changed.
+
+    Snapshots of every scope (global, plus each guild in `guilds`) are compared
+    against the last snapshot that was synced, and only the scopes that differ
+    are synced. This keeps reloads from hitting Discord's rate limits on
+    command syncing. Requires a `discord.py` style `client.tree`.
+    """
+
+    def __init__(self, tree, guilds: Iterable[int] = ()):
+        self.tree = tree
+        self.guilds = tuple(guilds)
+        self.synced = {}
+
+    def scopes(self) -> list:
+        return [None, *self.guilds]
+
+    def payload(self, scope: Optional[int]) -> str:
+        """Returns a canonical representation of the commands registered for a scope."""
+        guild = Snowflake(scope) if scope is not None else None
+        commands = []
+        for command in self.tree.get_commands(guild=guild):
+            try:
+                commands.append(command.to_dict(self.tree))
+            except TypeError:
+                # discord.py < 2.4 takes no arguments
+                commands.append(command.to_dict())
+
+        return json.dumps(sorted(commands, key=lambda c: (c.get('type', 1), c.get('name', ''))), sort_keys=True)
+
+    def mark_synced(self):
+        """Assumes the current tree matches Discord, ie. right after startup."""
+        self.synced = {scope: self.payload(scope) for scope in self.scopes()}
+
+    async def sync(self) -> list:
+        """Syncs every scope whose commands changed since the last sync. Returns the synced scopes."""
+        synced = []
+        for scope in self.scopes():
+            payload = self.payload(scope)
+            if self.synced.get(scope) == payload:
+                continue
+
+            try:
+                await self.tree.sync(guild=Snowflake(scope) if scope is not None else None)
+            except Exception as exc:
+                logger.error(f'Failed to sync application commands for {scope or "global"} scope: {exc!r}')
+                continue
+
+            self.synced[scope] = payload
+            synced.append(scope)
+            logger.info(f'Synced application commands for {f"guild {scope}" if scope else "global"} scope.')
+
+        return synced
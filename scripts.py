@@ -1,5 +1,6 @@
 # This file is used for calling scripts through the poetry CLI.
 
+import sys
 from subprocess import CalledProcessError, run
 
 libraries = [
@@ -37,7 +38,12 @@ def reset_environment(library: str):
 
 def fmt():
     """Runs black on the project source directory. Uses the config defined in `pyproject.toml`."""
-    run(['black', 'cogwatch/', 'integrations/', 'examples', 'tests', './'])
+    run(['black', 'cogwatch/', 'integrations/', 'examples', 'tests', 'benchmarks', './'])
+
+
+def benchmark():
+    """Runs the offline benchmarks. Extra arguments are passed through, ie. `poetry run benchmark --cogs 500`."""
+    run(['python', '-m', 'benchmarks', *sys.argv[1:]])
 
 
 def discord4py():
@@ -0,0 +1,40 @@
+import pytest
+
+
+class ClientMock:
+    """Stands in for a bot, recording every extension operation in `calls` as `(operation, name)`.
+
+    Operations on an extension listed in `broken` raise, like a cog whose setup fails.
+    """
+
+    def __init__(self, extensions=(), broken=('commands.broken',)):
+        self.extensions = dict.fromkeys(extensions)
+        self.broken = set(broken)
+        self.calls = []
+
+    def record(self, operation, name):
+        self.calls.append((operation, name))
+        if name in self.broken:
+            raise RuntimeError('setup failed')
+
+    async def load_extension(self, name):
+        self.record('load', name)
+        self.extensions[name] = None
+
+    async def reload_extension(self, name):
+        self.record('reload', name)
+
+    async def unload_extension(self, name):
+        self.record('unload', name)
+        del self.extensions[name]
+
+
+@pytest.fixture
+def make_client():
+    """Returns a factory for mock clients, for tests that need several or some loaded extensions."""
+    return ClientMock
+
+
+@pytest.fixture
+def client():
+    return ClientMock()
@@ -0,0 +1,85 @@
+import asyncio
+
+from cogwatch import Watcher
+from cogwatch.admission import AdmissionController, TokenBucket
+
+
+class MonitorStub:
+    interval = 0.01
+
+    def __init__(self, lag: float):
+        self.lag = lag
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+def test_token_bucket_paces():
+    async def main():
+        bucket = TokenBucket(rate=100, burst=2)
+        return [await bucket.acquire() for _ in range(4)]
+
+    waits = asyncio.run(main())
+    assert waits[:2] == [0.0, 0.0]
+    assert all(wait > 0 for wait in waits[2:])
+
+
+def test_defers_while_lagging():
+    async def main():
+        controller = AdmissionController(lag_threshold=0.1)
+        controller.monitor = MonitorStub(lag=0.5)
+        asyncio.get_running_loop().call_later(0.05, setattr, controller.monitor, 'lag', 0.0)
+        return controller, await controller.admit('reload', 'commands.ping')
+
+    controller, decision = asyncio.run(main())
+    assert decision['decision'] == 'deferred'
+    assert decision['lag'] == 0.5
+    assert decision['waited'] >= 0.05
+    assert controller.summary()['deferred'] == 1
+
+
+def test_runs_anyway_after_max_defer():
+    async def main():
+        controller = AdmissionController(lag_threshold=0.1, max_defer=0.05)
+        controller.monitor = MonitorStub(lag=0.5)
+        return await controller.admit('reload', 'commands.ping')
+
+    assert asyncio.run(main())['decision'] == 'forced'
+
+
+def test_stops_deferring_after_forcing_until_lag_recovers():
+    async def main():
+        controller = AdmissionController(lag_threshold=0.1, max_defer=0.05)
+        controller.monitor = MonitorStub(lag=0.5)
+        async with controller.batch():
+            decisions = [(await controller.admit('reload', f'commands.cog_{i}')) for i in range(3)]
+            controller.monitor.lag = 0.0
+            decisions.append(await controller.admit('reload', 'commands.cog_3'))
+            controller.monitor.lag = 0.5
+            decisions.append(await controller.admit('reload', 'commands.cog_4'))
+        return decisions
+
+    decisions = asyncio.run(main())
+    assert [decision['decision'] for decision in decisions] == ['forced', 'forced', 'forced', 'admitted', 'forced']
+    # only the first operation, and the first one after the lag recovered, waited for it
+    assert decisions[0]['waited'] >= 0.05 and decisions[4]['waited'] >= 0.05
+    assert decisions[1]['waited'] < 0.05 and decisions[2]['waited'] < 0.05
+
+
+def test_watcher_admission(client):
+    async def main():
+        watcher = Watcher(
+            client, admission=True, admission_rate=200, admission_burst=2, precompile=False, default_logger=False
+        )
+        await watcher.apply([('load', f'commands.cog_{i}') for i in range(5)])
+        assert not watcher.admission.monitor.running
+        return watcher
+
+    watcher = asyncio.run(main())
+    summary = watcher.admission.summary()
+    assert summary['admitted'] + summary['paced'] == 5
+    assert summary['paced'] >= 2
+    assert watcher.metrics.histogram('admission').count == 5
@@ -0,0 +1,30 @@
+import asyncio
+import json
+
+import pytest
+
+from benchmarks.runner import run
+from benchmarks.storms import SCENARIOS
+
+
+@pytest.mark.parametrize('client', ['async', 'sync'])
+@pytest.mark.parametrize('scenario', SCENARIOS)
+def test_scenarios(client, scenario):
+    result = asyncio.run(run(client, scenario, cogs=12, groups=3, runs=1))
+
+    assert result.events > 0
+    assert result.actions > 0
+    assert result.failed == 0
+    assert result.summary()['events_per_second'] > 0
+
+
+def test_replay(tmp_path):
+    recording = tmp_path / 'burst.json'
+    recording.write_text(json.dumps([[['modified', 'group_0/cog_0.py']], [['deleted', 'group_0/cog_0.py']]]))
+
+    result = asyncio.run(run('async', 'replay', cogs=4, groups=2, runs=1, replay=str(recording)))
+
+    assert result.scenario == 'replay'
+    assert result.events == 2
+    assert result.actions == 2
+    assert result.failed == 0
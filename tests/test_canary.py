@@ -0,0 +1,90 @@
+import asyncio
+import sys
+
+import pytest
+
+from cogwatch.canary import CanaryPool, StubBot
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32', reason='canary workers rely on POSIX process handling')
+
+COGS = {
+    'good': 'class Cog:\n    def __init__(self, bot):\n        self.bot = bot\n\n'
+    'async def setup(bot):\n    await bot.add_cog(Cog(bot))\n',
+    'broken': 'def setup(bot):\n    raise RuntimeError("bad config")\n',
+    'hangs': 'import time\n\ndef setup(bot):\n    time.sleep(60)\n',
+    'greedy': 'def setup(bot):\n    data = bytearray(1024 * 1024 * 1024)\n',
+}
+
+
+def test_stub_bot():
+    async def setup(bot):
+        await bot.add_cog(object())
+        return bot.loop.create_task
+
+    assert asyncio.run(setup(StubBot())) is not None
+
+
+def test_canary_pool(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cogs = tmp_path / 'canary_cogs'
+    cogs.mkdir()
+    for name, source in COGS.items():
+        (cogs / f'{name}.py').write_text(source)
+
+    pool = CanaryPool(size=2, timeout=2, memory=256 * 1024 * 1024)
+
+    async def main():
+        try:
+            return await asyncio.gather(*(pool.check(f'canary_cogs.{name}') for name in COGS))
+        finally:
+            await pool.close()
+
+    good, broken, hangs, greedy = asyncio.run(main())
+
+    assert good is None
+    assert broken == 'RuntimeError: bad config'
+    assert hangs == 'timed out after 2s'
+    assert greedy == 'exceeded the memory budget'
+
+
+def test_canary_uses_parent_path(tmp_path, monkeypatch):
+    # a root outside the working directory, importable only through sys.path
+    shared = tmp_path / 'shared'
+    (shared / 'shared_cogs').mkdir(parents=True)
+    (shared / 'shared_cogs' / 'tags.py').write_text(COGS['good'])
+    (tmp_path / 'bot').mkdir()
+    monkeypatch.chdir(tmp_path / 'bot')
+    monkeypatch.syspath_prepend(str(shared))
+
+    pool = CanaryPool(size=1, timeout=5)
+
+    async def main():
+        try:
+            return await pool.check('shared_cogs.tags')
+        finally:
+            await pool.close()
+
+    assert asyncio.run(main()) is None
+
+
+def test_cancelled_check_stops_its_worker(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'canary_cogs').mkdir()
+    (tmp_path / 'canary_cogs' / 'hangs.py').write_text(COGS['hangs'])
+
+    pool = CanaryPool(size=1, timeout=30)
+
+    async def main():
+        await pool.start()
+        process = pool.idle._queue[0]
+        task = asyncio.create_task(pool.check('canary_cogs.hangs'))
+        try:
+            await asyncio.sleep(0.5)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return process.returncode
+        finally:
+            await pool.close()
+
+    assert asyncio.run(main()) is not None
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import os
+import stat
+import subprocess
+import sys
+
+import pytest
+
+from cogwatch import Watcher, cluster
+
+
+def test_leader_broadcasts_to_followers(tmp_path, make_client):
+    path = str(tmp_path / 'cluster.sock')
+    leader = Watcher(make_client(['commands.ping']), cluster_socket=path, precompile=False, rollback=False)
+    follower_client = make_client()
+    follower = Watcher(follower_client, cluster_socket=path, precompile=False, rollback=False)
+
+    async def main():
+        assert await leader.cluster.start()
+        assert stat.S_IMODE(os.stat(path).st_mode) & 0o077 == 0
+        assert not await follower.cluster.start()
+
+        # wait for the follower to introduce itself
+        while not leader.cluster.followers:
+            await asyncio.sleep(0.01)
+
+        try:
+            return await leader.cluster.broadcast([('reload', 'commands.ping')])
+        finally:
+            await follower.cluster.close()
+            await leader.cluster.close()
+
+    results = asyncio.run(main())
+
+    # the follower had not loaded the cog yet, so it was loaded rather than reloaded
+    assert follower_client.calls == [('load', 'commands.ping')]
+    assert [result['ok'] for pid_results in results.values() for result in pid_results] == [True]
+
+
+def test_import_without_fcntl(client, monkeypatch):
+    code = 'import sys; sys.modules["fcntl"] = None; import cogwatch'
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+    monkeypatch.setattr(cluster, 'fcntl', None)
+    with pytest.raises(RuntimeError):
+        Watcher(client, cluster_socket='cluster.sock')
+
+
+class WriterMock:
+    def __init__(self):
+        self.written = []
+
+    def write(self, data):
+        self.written.append(data)
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_promotion_rescans_dependencies(tmp_path, monkeypatch, client):
+    monkeypatch.chdir(tmp_path)
+    cogs = tmp_path / 'commands'
+    cogs.mkdir()
+    (cogs / 'ping.py').write_text('def setup(bot):\n    pass\n')
+
+    watcher = Watcher(client, cluster_socket=str(tmp_path / 'cluster.sock'), default_logger=False)
+    watcher.scan_dependencies()
+
+    # the file changes while this process follows, so its startup state is stale
+    (cogs / 'ping.py').write_text('from commands import utils\n\ndef setup(bot):\n    pass\n')
+    (cogs / 'utils.py').write_text('x = 1\n')
+
+    calls = []
+    monkeypatch.setattr(watcher, 'start_watching', lambda: calls.append(dict(watcher._digests)))
+
+    async def promote():
+        return True
+
+    monkeypatch.setattr(watcher.cluster, 'start', promote)
+
+    async def main():
+        reader = asyncio.StreamReader()
+        reader.feed_eof()
+        await watcher.cluster.follow(reader, WriterMock())
+
+    asyncio.run(main())
+    [digests] = calls
+    assert digests == {
+        'commands.ping': Watcher.file_digest(cogs / 'ping.py'),
+        'commands.utils': Watcher.file_digest(cogs / 'utils.py'),
+    }
+    assert watcher.dependency_graph.dependents({'commands.utils'}) == {'commands.ping'}
+
+
+def test_follower_survives_malformed_batches(tmp_path, monkeypatch, client):
+    watcher = Watcher(client, cluster_socket=str(tmp_path / 'cluster.sock'), precompile=False, rollback=False)
+
+    async def demote():
+        return False
+
+    monkeypatch.setattr(watcher.cluster, 'start', demote)
+
+    async def main():
+        reader = asyncio.StreamReader()
+        for message in ({'action': 'reload'}, {'actions': [['reload']]}, {'actions': [['load', 'commands.ping']]}):
+            reader.feed_data(json.dumps(message).encode() + b'\n')
+        reader.feed_eof()
+        writer = WriterMock()
+        await watcher.cluster.follow(reader, writer)
+        return [json.loads(data) for data in writer.written[1:]]
+
+    missing, short, loaded = asyncio.run(main())
+    assert missing['results'] == short['results'] == [] and 'actions' in missing['error']
+    assert [result['ok'] for result in loaded['results']] == [True]
+    assert 'commands.ping' in client.extensions
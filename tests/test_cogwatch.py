@@ -1,4 +1,11 @@
+import asyncio
+import importlib.util
+import sys
+from pathlib import Path
+
 import pytest
+from watchfiles import Change
+
 from cogwatch import Watcher
 
 
@@ -49,3 +56,342 @@ def test_get_cog_name():
     cog = default_watcher.get_cog_name(path)
 
     assert cog == 'cmd'
+
+
+def test_coalesce_changes(tmp_path):
+    c = ClientMock()
+    c.extensions = {'commands.moved': None, 'commands.edited': None}
+    watcher = Watcher(c)
+
+    cogs = tmp_path / 'commands'
+    cogs.mkdir()
+    (cogs / 'edited.py').write_text('def setup(bot):\n    pass\n')
+    (cogs / 'new.py').write_text('def setup(bot):\n    pass\n')
+
+    changes = {
+        (Change.deleted, str(cogs / 'edited.py')),
+        (Change.added, str(cogs / 'edited.py')),
+        (Change.modified, str(cogs / 'edited.py')),
+        (Change.added, str(cogs / 'new.py')),
+        (Change.modified, str(cogs / 'new.py')),
+        (Change.deleted, str(cogs / 'moved.py')),
+        (Change.deleted, str(cogs / 'gone.py')),
+    }
+
+    assert watcher.coalesce_changes(changes) == [
+        ('unload', 'commands.moved'),
+        ('reload', 'commands.edited'),
+        ('load', 'commands.new'),
+    ]
+
+
+def test_coalesce_changes_skips_unchanged(tmp_path, monkeypatch, make_client):
+    monkeypatch.chdir(tmp_path)
+    c = make_client(['commands.ping'])
+    watcher = Watcher(c, precompile=False, rollback=False)
+
+    cog = tmp_path / 'commands' / 'ping.py'
+    cog.parent.mkdir()
+    cog.write_text('x = 1\n')
+    changes = {(Change.modified, str(cog))}
+
+    def reload():
+        return [(result['name'], result['ok']) for result in asyncio.run(watcher.handle_changes(changes))]
+
+    # the first change has no cached digest to compare against
+    assert reload() == [('commands.ping', True)]
+
+    # touching the file without changing its contents is a no-op
+    cog.write_text('x = 1\n')
+    assert reload() == []
+
+    cog.write_text('x = 2\n')
+    assert reload() == [('commands.ping', True)]
+
+    # a version that failed to reload is retried when saved again, as it was never loaded
+    c.broken.add('commands.ping')
+    cog.write_text('x = 3\n')
+    assert reload() == [('commands.ping', False)]
+    c.broken.clear()
+    cog.write_text('x = 3\n')
+    assert reload() == [('commands.ping', True)]
+    assert reload() == []
+
+    watcher.skip_unchanged = False
+    assert reload() == [('commands.ping', True)]
+
+
+def test_coalesce_changes_reloads_dependents(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cogs = tmp_path / 'commands'
+    cogs.mkdir()
+    (cogs / 'utils.py').write_text('x = 1\n')
+    (cogs / 'ping.py').write_text('from commands import utils\n\ndef setup(bot):\n    pass\n')
+    (cogs / 'other.py').write_text('def setup(bot):\n    pass\n')
+
+    c = ClientMock()
+    c.extensions = {'commands.ping': None, 'commands.other': None}
+    watcher = Watcher(c)
+    watcher.scan_dependencies()
+
+    (cogs / 'utils.py').write_text('x = 2\n')
+    changes = {(Change.modified, str(cogs / 'utils.py'))}
+
+    assert watcher.coalesce_changes(changes) == [('evict', 'commands.utils'), ('reload', 'commands.ping')]
+
+
+def test_compile_actions_rejects_syntax_errors(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, 'dont_write_bytecode', False)
+    cogs = tmp_path / 'commands'
+    cogs.mkdir()
+    (cogs / 'good.py').write_text('def setup(bot):\n    pass\n')
+    (cogs / 'bad.py').write_text('def setup(bot) pass\n')
+
+    watcher = Watcher(ClientMock())
+    actions = [('unload', 'commands.gone'), ('reload', 'commands.bad'), ('load', 'commands.good')]
+
+    assert asyncio.run(watcher.compile_actions(actions)) == [('unload', 'commands.gone'), ('load', 'commands.good')]
+    assert Path(importlib.util.cache_from_source(str(cogs / 'good.py'))).exists()
+
+
+def test_compile_actions_without_writing_bytecode(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, 'dont_write_bytecode', True)
+    cogs = tmp_path / 'commands'
+    cogs.mkdir()
+    (cogs / 'good.py').write_text('def setup(bot):\n    pass\n')
+    (cogs / 'bad.py').write_text('def setup(bot) pass\n')
+
+    watcher = Watcher(ClientMock())
+    actions = [('reload', 'commands.bad'), ('load', 'commands.good')]
+
+    assert asyncio.run(watcher.compile_actions(actions)) == [('load', 'commands.good')]
+    assert not (cogs / '__pycache__').exists()
+
+
+def test_preload_concurrency(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cogs = tmp_path / 'commands'
+    cogs.mkdir()
+    for name in ('database', 'a', 'b', 'c', 'broken'):
+        (cogs / f'{name}.py').write_text('def setup(bot):\n    pass\n')
+
+    class AsyncClientMock(ClientMock):
+        def __init__(self):
+            self.extensions = {}
+            self.running = 0
+            self.max_running = 0
+            self.order = []
+
+        async def load_extension(self, name):
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            self.order.append(name)
+            await asyncio.sleep(0.01)
+            self.running -= 1
+            if name == 'commands.broken':
+                raise RuntimeError('setup failed')
+            self.extensions[name] = None
+
+    c = AsyncClientMock()
+    watcher = Watcher(c, preload_concurrency=2, preload_order=['commands.database'])
+    results = asyncio.run(watcher._preload())
+
+    assert c.order[0] == 'commands.database'
+    assert c.max_running == 2
+    assert results == {
+        'commands.database': True,
+        'commands.a': True,
+        'commands.b': True,
+        'commands.broken': False,
+        'commands.c': True,
+    }
+
+
+def test_wait_for_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    watcher = Watcher(ClientMock(), path='bot/commands', debounce=200)
+
+    async def create_later():
+        await asyncio.sleep(0.3)
+        (tmp_path / 'bot' / 'commands').mkdir(parents=True)
+
+    async def main():
+        task = asyncio.create_task(create_later())
+        await asyncio.wait_for(watcher.wait_for_dir(), timeout=10)
+        await task
+
+    asyncio.run(main())
+    assert watcher.dir_exists()
+
+
+def test_extension_timings():
+    class SyncClientMock(ClientMock):
+        extensions = {}
+
+        def reload_extension(self, name):
+            pass
+
+    watcher = Watcher(SyncClientMock())
+    assert asyncio.run(watcher.reload('commands.ping'))
+    assert watcher.metrics.histogram('reload', 'commands.ping').count == 1
+
+
+class ImportingClientMock(ClientMock):
+    """Loads extensions the way discord.py does, but leaves a cog unloaded when reloading fails."""
+
+    def __init__(self):
+        self.extensions = {}
+
+    def load_extension(self, name):
+        spec = importlib.util.find_spec(name)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+            module.setup(self)
+        except Exception:
+            del sys.modules[name]
+            raise
+        self.extensions[name] = module
+
+    def unload_extension(self, name):
+        del self.extensions[name]
+        sys.modules.pop(name, None)
+
+    def reload_extension(self, name):
+        self.unload_extension(name)
+        self.load_extension(name)
+
+
+def test_reload_rollback(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    cogs = tmp_path / 'rollback_cogs'
+    cogs.mkdir()
+    cog = cogs / 'ping.py'
+    cog.write_text('VERSION = 1\n\ndef setup(bot):\n    pass\n')
+
+    c = ImportingClientMock()
+    watcher = Watcher(c, path='rollback_cogs', precompile=False)
+
+    async def main():
+        assert await watcher.load('rollback_cogs.ping')
+
+        cog.write_text('VERSION = 2\n\ndef setup(bot):\n    raise RuntimeError\n')
+        assert not await watcher.reload('rollback_cogs.ping')
+
+    asyncio.run(main())
+    assert c.extensions['rollback_cogs.ping'].VERSION == 1
+
+
+def test_reload_rollback_of_a_package_cog(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    cog = tmp_path / 'rollback_pkg' / 'ping'
+    cog.mkdir(parents=True)
+    (cog / 'helper.py').write_text('VERSION = 1\n')
+    (cog / '__init__.py').write_text('from . import helper\n\ndef setup(bot):\n    pass\n')
+
+    c = ImportingClientMock()
+    watcher = Watcher(c, path='rollback_pkg', precompile=False)
+
+    async def main():
+        assert await watcher.load('rollback_pkg.ping')
+
+        (cog / '__init__.py').write_text('def setup(bot):\n    raise RuntimeError\n')
+        sys.modules.pop('rollback_pkg.ping.helper')
+        assert not await watcher.reload('rollback_pkg.ping')
+
+    asyncio.run(main())
+    restored = c.extensions['rollback_pkg.ping']
+    assert restored.__path__ == [str(cog)]
+    assert restored.helper.VERSION == 1
+
+
+def test_get_cog_dir_within_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    watcher = Watcher(ClientMock())
+
+    # a nested directory sharing the root's name no longer truncates the dotted path
+    nested = str(tmp_path / 'commands' / 'games' / 'commands' / 'dice.py')
+    assert watcher.get_cog_dir(nested) == 'commands.games.commands.dice'
+
+    # results are cached until invalidated
+    watcher._cog_dirs[nested] = 'stale'
+    assert watcher.get_cog_dir(nested) == 'stale'
+    watcher.invalidate_cog_dirs(nested)
+    assert watcher.get_cog_dir(nested) == 'commands.games.commands.dice'
+
+
+def test_multiple_roots(tmp_path, monkeypatch):
+    project = tmp_path / 'bot'
+    shared = tmp_path / 'shared' / 'cogs'
+    (project / 'commands').mkdir(parents=True)
+    shared.mkdir(parents=True)
+    monkeypatch.chdir(project)
+
+    (shared / 'utils.py').write_text('x = 1\n')
+    (shared / 'tags.py').write_text('def setup(bot):\n    pass\n')
+    (project / 'commands' / 'ping.py').write_text('from shared import utils\n\ndef setup(bot):\n    pass\n')
+
+    c = ClientMock()
+    c.extensions = {'commands.ping': None, 'shared.tags': None}
+    watcher = Watcher(c, path={'commands': None, '../shared/cogs': 'shared'})
+
+    # each root maps onto its own package
+    assert watcher.path == 'commands'
+    assert watcher.get_cog_dir(str(shared / 'tags.py')) == 'shared.tags'
+    assert watcher.get_cog_dir(str(project / 'commands' / 'ping.py')) == 'commands.ping'
+    assert watcher.get_cog_path('shared.tags') == shared / 'tags.py'
+    assert sorted(file.name for file in watcher.iter_cog_files()) == ['ping.py', 'tags.py', 'utils.py']
+
+    # changes across roots are applied as a single ordered batch
+    watcher.scan_dependencies()
+    (shared / 'utils.py').write_text('x = 2\n')
+    (shared / 'tags.py').write_text('def setup(bot):\n    return None\n')
+    changes = {(Change.modified, str(shared / 'utils.py')), (Change.modified, str(shared / 'tags.py'))}
+
+    assert watcher.coalesce_changes(changes) == [
+        ('evict', 'shared.utils'),
+        ('reload', 'commands.ping'),
+        ('reload', 'shared.tags'),
+    ]
+
+
+def test_dir_exists_checks_every_root(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'commands').mkdir()
+
+    watcher = Watcher(ClientMock(), path=['commands', 'plugins'])
+    assert not watcher.dir_exists()
+
+    (tmp_path / 'plugins').mkdir()
+    assert watcher.dir_exists()
+
+
+def test_changed_helper_reaches_dependents(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    cogs = tmp_path / 'evict_cogs'
+    cogs.mkdir()
+    (cogs / 'utils.py').write_text('x = 1\n')
+    (cogs / 'ping.py').write_text('from evict_cogs import utils\n\nX = utils.x\n\ndef setup(bot):\n    pass\n')
+
+    c = ImportingClientMock()
+    watcher = Watcher(c, path='evict_cogs')
+    watcher.scan_dependencies()
+
+    async def main():
+        assert await watcher.load('evict_cogs.ping')
+
+        (cogs / 'utils.py').write_text('x = 22\n')
+        return await watcher.handle_changes({(Change.modified, str(cogs / 'utils.py'))})
+
+    results = asyncio.run(main())
+    assert [(r['action'], r['name'], r['ok']) for r in results] == [
+        ('evict', 'evict_cogs.utils', True),
+        ('reload', 'evict_cogs.ping', True),
+    ]
+    assert c.extensions['evict_cogs.ping'].X == 22
@@ -0,0 +1,73 @@
+import asyncio
+import json
+import os
+import stat
+
+import pytest
+
+from cogwatch import Watcher
+from cogwatch.control import ControlServer, send_request
+
+
+def test_parse():
+    assert ControlServer.parse({'action': 'reload', 'name': 'commands.ping'}) == [('reload', 'commands.ping')]
+    assert ControlServer.parse({'action': 'batch', 'actions': [['unload', 'a'], ['load', 'b']]}) == [
+        ('unload', 'a'),
+        ('load', 'b'),
+    ]
+
+    with pytest.raises(ValueError):
+        ControlServer.parse({'action': 'evict', 'name': 'commands.ping'})
+    with pytest.raises(ValueError):
+        ControlServer.parse({'action': 'batch', 'actions': [['load']]})
+
+
+def test_control_socket(tmp_path, client):
+    path = str(tmp_path / 'cogwatch.sock')
+    watcher = Watcher(client, precompile=False, rollback=False)
+    server = ControlServer(watcher)
+
+    async def main():
+        await server.start(path)
+        try:
+            assert stat.S_IMODE(os.stat(path).st_mode) & 0o077 == 0
+            loaded = await send_request(path, {'action': 'load', 'name': 'commands.ping'})
+            batch = await send_request(
+                path, {'action': 'batch', 'actions': [['reload', 'commands.ping'], ['reload', 'commands.broken']]}
+            )
+            invalid = await send_request(path, {'action': 'explode'})
+        finally:
+            await server.close()
+
+        return loaded, batch, invalid
+
+    loaded, batch, invalid = asyncio.run(main())
+
+    assert loaded['ok'] and loaded['results'][0]['name'] == 'commands.ping'
+    assert not batch['ok']
+    assert [result['ok'] for result in batch['results']] == [True, False]
+    assert batch['results'][1]['error'] == 'RuntimeError: setup failed'
+    assert not invalid['ok'] and 'unknown action' in invalid['error']
+
+
+def test_control_socket_rejects_oversized_requests(tmp_path, client):
+    path = str(tmp_path / 'cogwatch.sock')
+    server = ControlServer(Watcher(client, precompile=False, rollback=False))
+
+    async def main():
+        await server.start(path)
+        reader, writer = await asyncio.open_unix_connection(path)
+        try:
+            writer.write(b'{"action": "load", "name": "' + b'x' * 2**17 + b'"}\n')
+            writer.write(json.dumps({'action': 'load', 'name': 'commands.ping'}).encode() + b'\n')
+            await writer.drain()
+            responses = [json.loads(await reader.readline()) for _ in range(2)]
+        finally:
+            writer.close()
+            await server.close()
+
+        return responses
+
+    oversized, loaded = asyncio.run(main())
+    assert not oversized['ok'] and 'too long' in oversized['error']
+    assert loaded['ok']
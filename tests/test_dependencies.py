@@ -0,0 +1,58 @@
+from cogwatch.dependencies import DependencyGraph
+
+
+def test_dependents_and_order():
+    graph = DependencyGraph()
+    graph.update('commands.utils', 'import os\n')
+    graph.update('commands.embeds', 'from . import utils\n')
+    graph.update('commands.ping', 'from commands.embeds import build\n\ndef setup(bot):\n    pass\n')
+    graph.update('commands.pong', 'from .utils import helper\n\nasync def setup(bot):\n    pass\n')
+    graph.update('commands.other', 'def setup(bot):\n    pass\n')
+
+    assert graph.dependencies('commands.embeds') == {'commands.utils'}
+    assert graph.dependents(['commands.utils']) == {'commands.embeds', 'commands.ping', 'commands.pong'}
+    assert graph.order(['commands.ping', 'commands.pong', 'commands.embeds']) == [
+        'commands.embeds',
+        'commands.pong',
+        'commands.ping',
+    ]
+
+    assert graph.is_extension('commands.ping')
+    assert not graph.is_extension('commands.utils')
+
+
+def test_package_relative_imports():
+    graph = DependencyGraph()
+    graph.update('commands.admin', 'from .checks import is_owner\n', is_package=True)
+    graph.update('commands.admin.checks', 'x = 1\n')
+
+    assert graph.dependencies('commands.admin') == {'commands.admin.checks'}
+
+
+def test_syntax_error_keeps_imports():
+    graph = DependencyGraph()
+    graph.update('commands.utils', 'x = 1\n')
+    graph.update('commands.ping', 'from commands import utils\n\ndef setup(bot):\n    pass\n')
+    graph.update('commands.ping', 'def setup(bot) pass\n')
+
+    assert graph.dependencies('commands.ping') == {'commands.utils'}
+
+    # unknown modules that fail to parse are assumed to be extensions
+    graph.update('commands.broken', 'def setup(bot) pass\n')
+    assert graph.is_extension('commands.broken')
+
+
+def test_dependents_follow_updates_and_removals():
+    graph = DependencyGraph()
+    graph.update('commands.utils', b'x = 1\n')
+    graph.update('commands.ping', b'from commands import utils\n\ndef setup(bot):\n    pass\n')
+    assert graph.dependents(['commands.utils']) == {'commands.ping'}
+
+    # an import that goes away takes its reverse edge with it
+    graph.update('commands.ping', b'def setup(bot):\n    pass\n')
+    assert graph.dependents(['commands.utils']) == set()
+
+    graph.update('commands.pong', b'from . import utils\n')
+    graph.remove('commands.pong')
+    assert graph.dependents(['commands.utils']) == set()
+    assert graph.importers == {}
@@ -0,0 +1,59 @@
+import asyncio
+
+from cogwatch.drain import CommandDrain
+
+
+class Command:
+    def __init__(self, module, version):
+        self.module = module
+        self.version = version
+
+
+class Context:
+    def __init__(self, command, message):
+        self.command = command
+        self.message = message
+
+
+class ClientMock:
+    def __init__(self):
+        self.extensions = {'commands.slow': None}
+        self.version = 1
+        self.log = []
+
+    async def invoke(self, ctx):
+        self.log.append(('start', ctx.message, ctx.command.version))
+        await asyncio.sleep(0.05)
+        self.log.append(('end', ctx.message, ctx.command.version))
+
+    async def get_context(self, message):
+        return Context(Command('commands.slow', self.version), message)
+
+
+def test_drain_waits_for_running_commands():
+    client = ClientMock()
+    drain = CommandDrain(client, timeout=5)
+
+    async def reload():
+        async with drain.drain('commands.slow'):
+            client.log.append(('reload',))
+            client.version = 2
+
+    async def main():
+        running = asyncio.create_task(client.invoke(Context(Command('commands.slow.cog', 1), 'first')))
+        await asyncio.sleep(0.01)
+        reloading = asyncio.create_task(reload())
+        await asyncio.sleep(0)
+        held = asyncio.create_task(client.invoke(Context(Command('commands.slow', 1), 'second')))
+        await asyncio.gather(running, reloading, held)
+
+    asyncio.run(main())
+
+    assert client.log == [
+        ('start', 'first', 1),
+        ('end', 'first', 1),
+        ('reload',),
+        ('start', 'second', 2),
+        ('end', 'second', 2),
+    ]
+    assert drain.in_flight == {}
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from cogwatch import Watcher
+from cogwatch.events import EventStream
+
+
+def test_overflow_policies():
+    async def main():
+        stream = EventStream()
+        oldest = stream.subscribe(maxsize=2)
+        newest = stream.subscribe(maxsize=2, overflow='drop_newest')
+        closing = stream.subscribe(maxsize=2, overflow='close')
+
+        for i in range(3):
+            stream.publish('reload', f'commands.cog_{i}')
+
+        assert [event.name for event in oldest.queue] == ['commands.cog_1', 'commands.cog_2']
+        assert [event.name for event in newest.queue] == ['commands.cog_0', 'commands.cog_1']
+        assert oldest.dropped == newest.dropped == closing.dropped == 1
+
+        # a closed subscription still drains what it had queued
+        assert closing.closed and closing not in stream.subscribers
+        assert [event.name async for event in closing] == ['commands.cog_0', 'commands.cog_1']
+
+    asyncio.run(main())
+
+
+def test_subscribe_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        EventStream().subscribe(overflow='block')
+
+
+def test_watcher_publishes_events(client):
+    async def main():
+        watcher = Watcher(client, precompile=False, rollback=False, default_logger=False)
+        subscription = watcher.subscribe()
+
+        await watcher.load('commands.ping')
+        await watcher.load('commands.broken')
+        await watcher.unload('commands.ping')
+        subscription.close()
+
+        return [event async for event in subscription]
+
+    events = asyncio.run(main())
+
+    assert [(event.operation, event.name, event.outcome) for event in events] == [
+        ('load', 'commands.ping', 'ok'),
+        ('load', 'commands.broken', 'failed'),
+        ('unload', 'commands.ping', 'ok'),
+    ]
+    assert isinstance(events[1].exception, RuntimeError)
+    assert events[1].error == 'RuntimeError: setup failed'
+    assert all(event.duration >= 0 for event in events)
+
+
+def test_watcher_publishes_rejections(tmp_path, monkeypatch, client):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'commands').mkdir()
+    (tmp_path / 'commands' / 'typo.py').write_text('def setup(bot)\n')
+
+    async def main():
+        watcher = Watcher(client, default_logger=False)
+        with watcher.subscribe() as subscription:
+            await watcher.apply([('load', 'commands.typo')])
+        return [event async for event in subscription]
+
+    [event] = asyncio.run(main())
+    assert (event.operation, event.outcome, event.error) == ('load', 'rejected', 'failed to compile')
@@ -0,0 +1,21 @@
+from watchfiles import Change
+
+from cogwatch.filters import CogFilter
+
+
+def test_default_filter():
+    cog_filter = CogFilter()
+
+    assert cog_filter(Change.modified, '/bot/commands/ping.py')
+    assert not cog_filter(Change.modified, '/bot/commands/ping.pyc')
+    assert not cog_filter(Change.modified, '/bot/commands/__pycache__/ping.cpython-310.pyc')
+    assert not cog_filter(Change.modified, '/bot/commands/.ping.py.swp')
+    assert not cog_filter(Change.modified, '/bot/commands/bot.log')
+
+
+def test_exclude_filter():
+    cog_filter = CogFilter(exclude=['test_*.py', 'drafts/*'])
+
+    assert cog_filter(Change.added, '/bot/commands/ping.py')
+    assert not cog_filter(Change.added, '/bot/commands/test_ping.py')
+    assert not cog_filter(Change.added, '/bot/commands/drafts/pong.py')
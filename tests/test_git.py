@@ -0,0 +1,81 @@
+import asyncio
+import os
+import shutil
+import subprocess
+
+import pytest
+from watchfiles import Change
+
+from cogwatch import Watcher, git
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason='git is not installed')
+
+
+def commit(repo, message):
+    env = {**os.environ, 'GIT_AUTHOR_NAME': 'test', 'GIT_AUTHOR_EMAIL': 'test@example.com'}
+    env.update(GIT_COMMITTER_NAME='test', GIT_COMMITTER_EMAIL='test@example.com')
+    subprocess.run(['git', 'add', '-A'], cwd=repo, check=True)
+    subprocess.run(['git', 'commit', '-qm', message], cwd=repo, check=True, env=env)
+    head = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=repo, check=True, capture_output=True)
+    return head.stdout.decode().strip()
+
+
+def test_diff_changes(tmp_path):
+    repo = tmp_path / 'bot'
+    cogs = repo / 'commands'
+    cogs.mkdir(parents=True)
+    subprocess.run(['git', 'init', '-q'], cwd=repo, check=True)
+
+    (cogs / 'ping.py').write_text('x = 1\n')
+    (cogs / 'old.py').write_text('x = 1\n')
+    (repo / 'README.md').write_text('outside the watched path\n')
+    first = commit(repo, 'first')
+
+    (cogs / 'ping.py').write_text('x = 2\n')
+    (cogs / 'old.py').rename(cogs / 'new.py')
+    (repo / 'README.md').write_text('changed\n')
+    second = commit(repo, 'second')
+
+    changes = asyncio.run(git.diff_changes(first, second, cogs))
+
+    assert changes == {
+        (Change.modified, str(cogs / 'ping.py')),
+        (Change.deleted, str(cogs / 'old.py')),
+        (Change.added, str(cogs / 'new.py')),
+    }
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='file names must be valid UTF-16 on Windows')
+def test_diff_changes_with_undecodable_names(tmp_path):
+    repo = tmp_path / 'bot'
+    cogs = repo / 'commands'
+    cogs.mkdir(parents=True)
+    subprocess.run(['git', 'init', '-q'], cwd=repo, check=True)
+
+    (cogs / 'ping.py').write_text('x = 1\n')
+    first = commit(repo, 'first')
+
+    # a Latin-1 file name, which is not valid UTF-8
+    latin = os.fsdecode(b'caf\xe9.py')
+    (cogs / latin).write_text('x = 1\n')
+    second = commit(repo, 'second')
+
+    changes = asyncio.run(git.diff_changes(first, second, cogs))
+    assert changes == {(Change.added, str(cogs / latin))}
+
+
+def test_is_ref_change():
+    assert git.is_ref_change(Change.modified, os.path.join('repo', '.git', 'HEAD'))
+    assert git.is_ref_change(Change.modified, os.path.join('repo', '.git', 'refs', 'heads', 'main'))
+    assert not git.is_ref_change(Change.added, os.path.join('repo', '.git', 'objects', 'ab', 'cdef'))
+
+
+def test_start_git_outside_a_repository(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('GIT_CEILING_DIRECTORIES', str(tmp_path))
+    (tmp_path / 'commands').mkdir()
+
+    watcher = Watcher(object(), git_head=True, default_logger=False)
+
+    # the error is logged instead of escaping the background task
+    asyncio.run(watcher._start_git())
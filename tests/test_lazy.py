@@ -0,0 +1,141 @@
+import asyncio
+
+from cogwatch import Watcher
+from cogwatch.lazy import LazyLoader, scan_commands
+
+SOURCE = '''
+from discord.ext import commands
+
+
+class Admin(commands.Cog):
+    @commands.command(name='purge', aliases=['clear'])
+    async def _purge(self, ctx):
+        pass
+
+    @commands.group()
+    async def config(self, ctx):
+        pass
+
+    @config.command()
+    async def prefix(self, ctx):
+        pass
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        pass
+
+
+async def setup(bot):
+    await bot.add_cog(Admin())
+'''
+
+
+class Command:
+    def __init__(self, callback, name, aliases):
+        self.callback = callback
+        self.name = name
+        self.aliases = aliases
+
+
+class CommandsModule:
+    Command = Command
+
+
+class ClientMock:
+    def __init__(self):
+        self.extensions = {}
+        self.commands = {}
+        self.processed = []
+
+    def get_command(self, name):
+        return self.commands.get(name)
+
+    def add_command(self, command):
+        self.commands[command.name] = command
+
+    def remove_command(self, name):
+        return self.commands.pop(name, None)
+
+    async def load_extension(self, name):
+        self.extensions[name] = None
+        self.add_command(Command(None, 'purge', []))
+
+    async def process_commands(self, message):
+        self.processed.append(message)
+
+
+class ContextMock:
+    message = 'purge 10'
+
+
+def test_scan_commands():
+    assert scan_commands(SOURCE) == {'purge': ('clear',), 'config': ()}
+
+
+APP_SOURCE = '''
+from discord import app_commands
+from discord.ext import commands
+
+
+class Slash(commands.Cog):
+    @app_commands.command(name='slashy')
+    async def slashy(self, interaction):
+        pass
+
+    @commands.command()
+    async def ping(self, ctx):
+        pass
+'''
+
+
+def test_scan_commands_skips_cogs_with_app_commands():
+    assert scan_commands(APP_SOURCE) == {}
+    assert scan_commands(SOURCE.replace('commands.group()', 'other.group()')) == {'purge': ('clear',)}
+
+    # cogs with app commands are loaded eagerly rather than deferred
+    watcher = Watcher(ClientMock(), lazy=True, default_logger=False)
+    watcher.lazy_loader.commands = CommandsModule
+    assert not watcher.lazy_loader.register('commands.slash', APP_SOURCE)
+    assert watcher.client.commands == {}
+
+
+HYBRID_SOURCE = '''
+from discord.ext import commands
+
+
+class Hybrid(commands.Cog):
+    @commands.hybrid_command()
+    async def ping(self, ctx):
+        pass
+
+    @commands.hybrid_group()
+    async def config(self, ctx):
+        pass
+'''
+
+
+def test_scan_commands_skips_cogs_with_hybrid_commands():
+    assert scan_commands(HYBRID_SOURCE) == {}
+
+    watcher = Watcher(ClientMock(), lazy=True, default_logger=False)
+    watcher.lazy_loader.commands = CommandsModule
+    assert not watcher.lazy_loader.register('commands.hybrid', HYBRID_SOURCE)
+    assert watcher.client.commands == {}
+
+
+def test_placeholder_loads_cog():
+    c = ClientMock()
+    watcher = Watcher(c, precompile=False, rollback=False)
+    loader = LazyLoader(watcher, CommandsModule)
+
+    assert loader.register('commands.admin', SOURCE)
+    assert set(c.commands) == {'purge', 'config'}
+    assert not loader.register('commands.events', 'async def setup(bot):\n    pass\n')
+
+    watcher.lazy_loader = loader
+    asyncio.run(c.commands['purge'].callback(ContextMock()))
+
+    assert 'commands.admin' in c.extensions
+    assert c.commands['purge'].callback is None
+    assert 'config' not in c.commands
+    assert c.processed == ['purge 10']
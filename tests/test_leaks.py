@@ -0,0 +1,59 @@
+import sys
+import types
+
+from cogwatch.leaks import LeakTracker
+
+
+class Cog:
+    pass
+
+
+def test_report_lists_surviving_generations():
+    tracker = LeakTracker()
+
+    freed = types.ModuleType('commands.freed')
+    leaked = types.ModuleType('commands.leaked')
+    cache = {'old': leaked}
+
+    tracker.track('commands.freed', [freed])
+    tracker.track('commands.leaked', [leaked, Cog()])
+    del freed, leaked
+
+    report = tracker.report()
+
+    assert [(entry['cog'], entry['type']) for entry in report] == [('commands.leaked', 'module')]
+    assert report[0]['generation'] == 1
+    assert report[0]['size'] > 0
+    assert any('old' in referrer for referrer in report[0]['referrers'])
+    assert cache
+
+
+def test_capture():
+    class Client:
+        cogs = {}
+
+    module = types.ModuleType('tests.leaky_cog')
+    sys.modules['tests.leaky_cog'] = module
+    try:
+        cog = type('Leaky', (), {'__module__': 'tests.leaky_cog'})()
+        Client.cogs['Leaky'] = cog
+
+        assert LeakTracker.capture(Client(), 'tests.leaky_cog') == [module, cog]
+    finally:
+        del sys.modules['tests.leaky_cog']
+
+
+def test_capture_package_cog():
+    class Client:
+        cogs = {}
+
+    module = types.ModuleType('tests.leaky_pkg')
+    sys.modules['tests.leaky_pkg'] = module
+    try:
+        cog = type('Leaky', (), {'__module__': 'tests.leaky_pkg.cog'})()
+        Client.cogs['Leaky'] = cog
+        Client.cogs['Other'] = type('Other', (), {'__module__': 'tests.leaky_pkg_other'})()
+
+        assert LeakTracker.capture(Client(), 'tests.leaky_pkg.__init__') == [module, cog]
+    finally:
+        del sys.modules['tests.leaky_pkg']
@@ -0,0 +1,61 @@
+import asyncio
+import logging
+import subprocess
+import sys
+
+from cogwatch import Watcher, library
+
+
+class ClientMock:
+    pass
+
+
+def test_import_does_not_load_library():
+    code = 'import sys, cogwatch; print(any(name in sys.modules for name in ("discord", "nextcord", "disnake")))'
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == 'False'
+
+
+def test_infer_from_client():
+    Bot = type('Bot', (), {'__module__': 'nextcord.ext.commands.bot'})
+    Subclassed = type('Subclassed', (Bot,), {'__module__': 'my_bot'})
+
+    assert library.infer(Subclassed()) == 'nextcord'
+    assert library.infer(ClientMock()) is None
+
+
+def test_resolve_is_cached():
+    resolved = library.resolve('nextcord')
+
+    assert resolved.name == 'nextcord'
+    assert resolved is library.resolve('nextcord')
+    assert resolved.ExtensionNotLoaded is resolved.commands.ExtensionNotLoaded
+
+
+def test_watcher_backend():
+    watcher = Watcher(ClientMock(), backend='nextcord', default_logger=False)
+    assert watcher.library is library.resolve('nextcord')
+
+
+def test_module_globals_resolve_lazily():
+    from cogwatch.cogwatch import ExtensionError, commands
+
+    assert ExtensionError is library.resolve().ExtensionError
+    assert commands is library.resolve().commands
+
+
+def test_cog_error_is_static():
+    # existing callers pass only the exception
+    Watcher.cog_error(RuntimeError('boom'))
+    Watcher.cog_error(SyntaxError('boom'), library.resolve().ExtensionError)
+
+
+def test_load_logs_unwrapped_errors(caplog, client):
+    watcher = Watcher(client, precompile=False, rollback=False, default_logger=False)
+
+    with caplog.at_level(logging.ERROR, logger='cogwatch'):
+        assert not asyncio.run(watcher.load('commands.broken'))
+
+    [record] = caplog.records
+    assert record.message == 'RuntimeError: setup failed'
+    assert record.exc_info[0] is RuntimeError
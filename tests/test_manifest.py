@@ -0,0 +1,72 @@
+import asyncio
+import os
+
+from cogwatch import Watcher
+from cogwatch.manifest import Manifest
+
+
+def test_walk_reuses_fresh_tree(tmp_path):
+    root = tmp_path / 'commands'
+    (root / 'admin').mkdir(parents=True)
+    (root / 'ping.py').write_text('')
+    (root / 'admin' / 'ban.py').write_text('')
+
+    manifest = Manifest(tmp_path / 'manifest.json')
+    assert sorted(manifest.walk(root)) == [root / 'admin' / 'ban.py', root / 'ping.py']
+    manifest.save()
+
+    cached = Manifest(tmp_path / 'manifest.json')
+    cached.load(root)
+    assert cached.is_fresh()
+
+    (root / 'admin' / 'kick.py').write_text('')
+    assert not cached.is_fresh()
+    assert root / 'admin' / 'kick.py' in cached.walk(root)
+
+
+def test_walk_skips_ignored_dirs(tmp_path):
+    root = tmp_path / 'commands'
+    (root / '__pycache__').mkdir(parents=True)
+    (root / 'ping.py').write_text('')
+
+    manifest = Manifest(tmp_path / 'manifest.json')
+    assert manifest.walk(root, ignore_dirs=['__pycache__']) == [root / 'ping.py']
+    assert str(root / '__pycache__') not in manifest.dirs
+
+    # writing bytecode does not make the tree stale
+    (root / '__pycache__' / 'ping.cpython-311.pyc').write_bytes(b'')
+    assert manifest.is_fresh()
+
+
+def test_preload_uses_manifest(tmp_path, monkeypatch, make_client):
+    monkeypatch.chdir(tmp_path)
+    cogs = tmp_path / 'commands'
+    cogs.mkdir()
+    for name in ('fast', 'slow', 'broken'):
+        (cogs / f'{name}.py').write_text('def setup(bot):\n    pass\n')
+
+    path = str(tmp_path / '.cogwatch.json')
+
+    async def preload(broken=('commands.broken',)):
+        client = make_client(broken=broken)
+        watcher = Watcher(client, manifest=path, precompile=False)
+        watcher.manifest.load(watcher.root)
+        await watcher._preload()
+        return client, watcher
+
+    client, watcher = asyncio.run(preload())
+    assert sorted(name for _, name in client.calls) == ['commands.broken', 'commands.fast', 'commands.slow']
+    assert os.path.exists(path)
+
+    # pretend the slow cog took a while last time
+    watcher.manifest.cogs['commands.slow']['duration'] = 5.0
+    watcher.manifest.save()
+
+    # the cog that failed is retried, but only once the others have loaded
+    client, _ = asyncio.run(preload())
+    assert client.calls == [('load', 'commands.slow'), ('load', 'commands.fast'), ('load', 'commands.broken')]
+
+    # so it recovers from transient failures without being touched
+    client, watcher = asyncio.run(preload(broken=()))
+    assert client.calls[-1] == ('load', 'commands.broken')
+    assert watcher.manifest.cogs['commands.broken']['ok']
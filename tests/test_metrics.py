@@ -0,0 +1,31 @@
+from cogwatch.metrics import Histogram, Metrics
+
+
+def test_histogram():
+    histogram = Histogram()
+    for ms in range(1, 101):
+        histogram.observe(ms / 1000)
+
+    assert histogram.count == 100
+    assert histogram.max == 0.1
+    assert histogram.percentile(50) == 0.05
+    assert histogram.percentile(95) == 0.095
+    assert sum(histogram.counts) == 100
+
+
+def test_metrics_hook():
+    recorded = []
+
+    def hook(phase, seconds, cog_dir):
+        recorded.append((phase, cog_dir))
+        raise RuntimeError('hooks cannot break recording')
+
+    metrics = Metrics(hook)
+    metrics.record('reload', 0.5, 'commands.slow')
+    metrics.record('reload', 0.1, 'commands.fast')
+    metrics.record('coalesce', 0.001)
+
+    assert recorded == [('reload', 'commands.slow'), ('reload', 'commands.fast'), ('coalesce', None)]
+    assert metrics.histogram('reload').count == 2
+    assert metrics.histogram('reload', 'commands.slow').max == 0.5
+    assert metrics.slowest('reload') == [('commands.slow', 0.5), ('commands.fast', 0.1)]
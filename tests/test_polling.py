@@ -0,0 +1,101 @@
+import asyncio
+import os
+
+from watchfiles import Change
+
+from cogwatch import Watcher, polling
+from cogwatch.filters import CogFilter
+from cogwatch.polling import Poller
+
+
+def test_scan_detects_changes(tmp_path):
+    (tmp_path / 'admin').mkdir()
+    (tmp_path / '__pycache__').mkdir()
+    (tmp_path / 'ping.py').write_text('')
+    (tmp_path / 'admin' / 'ban.py').write_text('')
+    (tmp_path / 'notes.txt').write_text('')
+    (tmp_path / '__pycache__' / 'ping.py').write_text('')
+
+    poller = Poller([tmp_path], CogFilter())
+    assert poller.scan() == {
+        (Change.added, str(tmp_path / 'ping.py')),
+        (Change.added, str(tmp_path / 'admin' / 'ban.py')),
+    }
+    assert str(tmp_path / '__pycache__') not in poller.dirs
+    assert poller.scan() == set()
+
+    (tmp_path / 'ping.py').write_text('x = 1\n')
+    (tmp_path / 'admin' / 'ban.py').unlink()
+    (tmp_path / 'admin' / 'kick.py').write_text('')
+
+    assert poller.scan() == {
+        (Change.modified, str(tmp_path / 'ping.py')),
+        (Change.deleted, str(tmp_path / 'admin' / 'ban.py')),
+        (Change.added, str(tmp_path / 'admin' / 'kick.py')),
+    }
+
+
+def test_scan_skips_listing_unchanged_dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(polling, 'RACY_NS', -1)
+    (tmp_path / 'admin').mkdir()
+    (tmp_path / 'admin' / 'ban.py').write_text('')
+
+    listed = []
+    scandir = os.scandir
+    monkeypatch.setattr(polling.os, 'scandir', lambda path: listed.append(path) or scandir(path))
+
+    poller = Poller([tmp_path], CogFilter())
+    poller.scan()
+    assert len(listed) == 2
+
+    # contents changes are still found, without listing any directory again
+    listed.clear()
+    (tmp_path / 'admin' / 'ban.py').write_text('x = 1\n')
+    assert poller.scan() == {(Change.modified, str(tmp_path / 'admin' / 'ban.py'))}
+    assert listed == []
+
+
+def test_scan_skips_unreadable_entries(tmp_path, monkeypatch):
+    (tmp_path / 'admin').mkdir()
+    (tmp_path / 'admin' / 'ban.py').write_text('')
+    (tmp_path / 'ping.py').write_text('')
+
+    poller = Poller([tmp_path], CogFilter())
+    assert len(poller.scan()) == 2
+
+    unreadable = {str(tmp_path / 'admin'), str(tmp_path / 'ping.py')}
+    stat = os.stat
+
+    def deny(path, *args, **kwargs):
+        if str(path) in unreadable:
+            raise PermissionError(13, 'Permission denied', str(path))
+        return stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(polling.os, 'stat', deny)
+    (tmp_path / 'kick.py').write_text('')
+
+    # what cannot be read is neither reported as deleted nor stops the scan
+    assert poller.scan() == {(Change.added, str(tmp_path / 'kick.py'))}
+    assert str(tmp_path / 'admin' / 'ban.py') in poller.files
+
+
+def test_watcher_polling(tmp_path, monkeypatch, client):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'commands').mkdir()
+
+    async def main():
+        watcher = Watcher(
+            client, polling=True, poll_interval=0.01, debounce=100, step=10, precompile=False, default_logger=False
+        )
+        task = asyncio.create_task(watcher._start())
+        while watcher.poller is None or not watcher.poller.dirs:
+            await asyncio.sleep(0.01)
+
+        (tmp_path / 'commands' / 'ping.py').write_text('def setup(bot):\n    pass\n')
+        try:
+            while 'commands.ping' not in client.extensions:
+                await asyncio.sleep(0.01)
+        finally:
+            task.cancel()
+
+    asyncio.run(asyncio.wait_for(main(), timeout=10))
@@ -0,0 +1,60 @@
+import asyncio
+
+from cogwatch.sync import TreeSync
+
+
+class AppCommand:
+    def __init__(self, name, description='...'):
+        self.name = name
+        self.description = description
+
+    def to_dict(self, tree):
+        return {'type': 1, 'name': self.name, 'description': self.description}
+
+
+class HTTPStub:
+    def __init__(self):
+        self.requests = []
+
+    async def bulk_upsert(self, guild_id, payload):
+        self.requests.append((guild_id, [command.name for command in payload]))
+
+
+class TreeStub:
+    """Mimics `discord.app_commands.CommandTree` on top of a fake HTTP client."""
+
+    def __init__(self):
+        self.http = HTTPStub()
+        self.commands = {}
+
+    def get_commands(self, guild=None):
+        return list(self.commands.get(guild.id if guild else None, {}).values())
+
+    def add(self, command, guild=None):
+        self.commands.setdefault(guild, {})[command.name] = command
+
+    async def sync(self, guild=None):
+        await self.http.bulk_upsert(guild.id if guild else None, self.get_commands(guild=guild))
+
+
+def test_sync_only_changed_scopes():
+    tree = TreeStub()
+    tree.add(AppCommand('ping'))
+    tree.add(AppCommand('config'), guild=42)
+
+    tree_sync = TreeSync(tree, guilds=[42])
+    tree_sync.mark_synced()
+
+    # a reload that re-registers identical commands syncs nothing
+    tree.add(AppCommand('ping'))
+    assert asyncio.run(tree_sync.sync()) == []
+
+    tree.add(AppCommand('ping', description='Pong!'))
+    tree.add(AppCommand('pong'))
+    assert asyncio.run(tree_sync.sync()) == [None]
+    assert tree.http.requests == [(None, ['ping', 'pong'])]
+
+    tree.commands[42].clear()
+    assert asyncio.run(tree_sync.sync()) == [42]
+    assert asyncio.run(tree_sync.sync()) == []
+    assert len(tree.http.requests) == 2